@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -130,3 +131,157 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 AUTH_USER_MODEL = 'core.User'
+
+
+# Trainer
+
+TRAINER_BULK_BATCH_SIZE = 500
+
+TRAINER_BULK_MAX_ROWS = 10000
+
+TRAINER_MAX_CLONE_STUDENTS = 1000
+
+TRAINER_PAGE_SIZE = 100
+
+TRAINER_MAX_PAGE_SIZE = 1000
+
+
+# Token authentication cache
+
+TOKEN_CACHE_MAXSIZE = 1024
+
+# Seconds a revoked token may still work in other processes when the
+# revocation cache below is not shared between them
+TOKEN_CACHE_TTL = 60
+
+# Name of a Django cache holding per-user revocation markers, checked on
+# every cache hit. Point it at a cache shared between workers, like
+# Redis, to revoke tokens in all processes at once. None disables it.
+TOKEN_REVOCATION_BACKEND = 'default'
+
+
+# Telegram id to student resolver
+
+STUDENT_CACHE_MAXSIZE = 10000
+
+STUDENT_CACHE_TTL = 60
+
+# Name of a Django cache shared between workers, which then holds all
+# resolutions so changes reach every process at once. Point it at a
+# shared cache like Redis in production. None keeps them in process,
+# where other processes may resolve a changed tg_id to the old student
+# for up to STUDENT_CACHE_TTL.
+STUDENT_CACHE_BACKEND = 'default'
+
+
+# Reviews
+
+TRAINER_REVIEW_LIMIT = 20
+
+TRAINER_MAX_REVIEW_LIMIT = 500
+
+TRAINER_MAX_SESSION_ANSWERS = 1000
+
+
+# Stats
+
+TRAINER_LEARNED_INTERVAL = 21
+
+TRAINER_STATS_DAYS = 30
+
+TRAINER_MAX_STATS_DAYS = 365
+
+
+# Search
+
+TRAINER_SEARCH_LIMIT = 50
+
+
+# Delta sync
+
+# Seconds of changes sent again to cover late commits of concurrent writes
+TRAINER_SYNC_OVERLAP = 2
+
+# Days tombstones are kept, older cursors get a full sync instead
+TRAINER_TOMBSTONE_DAYS = 30
+
+
+# Export
+
+TRAINER_EXPORT_CHUNK_SIZE = 2000
+
+
+# Caches
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+WORD_SET_CACHE_BACKEND = 'default'
+
+WORD_SET_CACHE_TTL = 300
+
+
+# Async read path
+
+# Threads running ORM calls of async views, 0 uses sync_to_async instead.
+# Pool threads close their connection after each call unless
+# CONN_MAX_AGE keeps it open.
+TRAINER_ASYNC_DB_THREADS = 32
+
+
+# Fast read path
+
+# Serve student and word list/retrieve from .values() rows and orjson
+TRAINER_FAST_READ = False
+
+
+# REST framework
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'core.parsers.MessagePackParser',
+    ],
+}
+
+
+# Metrics
+
+METRICS_ENABLED = True
+
+# Bearer token of the Prometheus scraper, set as the credentials of its
+# authorization section. Without it only staff sessions can read /metrics.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+# Dictionary autofill
+
+# Sorted dictionary file written by the build_dictionary command, used to
+# fill empty text of new words. None disables the autofill.
+TRAINER_DICTIONARY_PATH = os.environ.get('TRAINER_DICTIONARY_PATH')
+
+
+# Background jobs
+
+JOB_MAX_ATTEMPTS = 3
+
+# Seconds before a failed job runs again, multiplied by its attempts
+JOB_RETRY_DELAY = 30
+
+# Seconds after which a running job is assumed lost with its worker
+JOB_STALE_TIMEOUT = 600
+
+# Seconds between the checks of each worker for stale jobs
+JOB_REQUEUE_INTERVAL = 60
+
+JOB_POLL_INTERVAL = 1.0
@@ -9,7 +9,17 @@ class UserAdmin(BaseUserAdmin):
     list_display = ['email', 'name']
 
 
+class WordAdmin(admin.ModelAdmin):
+    list_display = ['word', 'translate', 'student']
+    # The text falls back to the lexeme, which is fetched in the same query
+    list_select_related = ['lexeme', 'student']
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Student)
-admin.site.register(models.Word)
+admin.site.register(models.Lexeme)
+admin.site.register(models.Word, WordAdmin)
 admin.site.register(models.WordSet)
+admin.site.register(models.ReviewLog)
+admin.site.register(models.Job)
+admin.site.register(models.StudentStats)
@@ -3,3 +3,16 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        import core.signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from core.metrics import cache_collector, registry
+        from core.middleware import install_query_counter
+        from core.resolvers import student_cache
+
+        registry.register_collector(cache_collector(
+            'student_cache', 'Telegram id resolver cache',
+            student_cache.stats))
+
+        connection_created.connect(install_query_counter)
@@ -0,0 +1,61 @@
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+_DONE = object()
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI handler reading streaming bodies outside the event loop.
+
+    Django 3.1 iterates streaming responses on the event loop, where a
+    body generator running queries, like the vocabulary export, fails
+    with SynchronousOnlyOperation. Each part is fetched in the thread
+    for synchronous code instead, so a server-side cursor stays on the
+    connection that opened it.
+    """
+
+    async def send_response(self, response, send):
+        """Encode and send a response out over ASGI"""
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append(
+                (b'Set-Cookie', cookie.output(header='').encode('ascii')
+                 .strip())
+            )
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers,
+        })
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, _DONE)
+            if part is _DONE:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def get_asgi_application():
+    """Set up Django and return the streaming aware ASGI handler"""
+    django.setup(set_prefix=False)
+
+    return StreamingASGIHandler()
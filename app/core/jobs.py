@@ -0,0 +1,123 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(kind):
+    """Register the decorated function as the handler of a job kind.
+
+    Handlers take the job payload and return a JSON serializable result.
+    """
+    def decorator(handler):
+        _handlers[kind] = handler
+        return handler
+
+    return decorator
+
+
+def enqueue(kind, payload, user=None):
+    """Queue a job and return it"""
+    if kind not in _handlers:
+        raise ValueError('No handler registered for job kind "%s"' % kind)
+
+    return Job.objects.create(kind=kind, payload=payload, user=user)
+
+
+def claim_job():
+    """Mark the next due job as running and return it, or None.
+
+    On PostgreSQL the candidate row is locked with SKIP LOCKED, so
+    workers never wait on each other. Other databases, like SQLite in
+    tests, rely on the conditional update alone, and a worker losing the
+    race moves on to the next candidate.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.QUEUED,
+        run_after__lte=now
+    ).order_by('run_after', 'id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            candidates = candidates.select_for_update(skip_locked=True)
+            return _mark_running(candidates[:1], now)
+
+    return _mark_running(candidates[:10], now)
+
+
+def _mark_running(candidates, now):
+    """Claim the first candidate still queued"""
+    for job in candidates:
+        claimed = Job.objects.filter(
+            pk=job.pk,
+            status=Job.QUEUED
+        ).update(
+            status=Job.RUNNING,
+            started_at=now,
+            attempts=job.attempts + 1
+        )
+        if claimed:
+            job.status = Job.RUNNING
+            job.started_at = now
+            job.attempts += 1
+            return job
+
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record its result or error"""
+    try:
+        result = _handlers[job.kind](job.payload)
+    except Exception:
+        logger.exception('Job %s failed', job.pk)
+        job.error = traceback.format_exc()
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOB_RETRY_DELAY * job.attempts
+            )
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'run_after',
+                            'finished_at'])
+
+    return job
+
+
+def requeue_stale_jobs():
+    """Queue again the jobs left running by a worker that died.
+
+    Jobs that used all their attempts are marked failed instead, so a
+    job killing its worker is not claimed forever. Returns the number
+    of requeued jobs.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    )
+    stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=Job.FAILED,
+        finished_at=now,
+        error='Worker lost while running the last attempt'
+    )
+
+    return stale.update(status=Job.QUEUED)
@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from core.models import Lexeme
+
+
+def lexeme_digest(word, translate, definition, example):
+    """Return the content address of a lexeme"""
+    content = json.dumps([word, translate, definition, example],
+                         ensure_ascii=False)
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _keep_differences(word):
+    """Clear the own text that equals the text of the lexeme"""
+    for field in Lexeme.TEXT_FIELDS:
+        own = 'own_%s' % field
+        if getattr(word, own) == getattr(word.lexeme, field):
+            setattr(word, own, None)
+
+
+def attach_lexemes(words):
+    """Point the words at shared lexemes before they are saved.
+
+    A word keeps its lexeme while the headword is unchanged, and text
+    edited since is stored on the word as an override. Other words are
+    matched to the lexeme with the same content, created when missing,
+    with a constant number of queries for any number of words.
+    """
+    pending = []
+    for word in words:
+        if word.lexeme_id is not None and word.lexeme.word == word.word:
+            _keep_differences(word)
+            continue
+        texts = [getattr(word, field) for field in Lexeme.TEXT_FIELDS]
+        pending.append((word, lexeme_digest(word.word, *texts), texts))
+    if not pending:
+        return
+
+    lexemes = Lexeme.objects.in_bulk(
+        {digest for _, digest, _ in pending},
+        field_name='digest'
+    )
+    missing = {}
+    for word, digest, texts in pending:
+        if digest not in lexemes and digest not in missing:
+            missing[digest] = Lexeme(
+                word=word.word,
+                digest=digest,
+                **dict(zip(Lexeme.TEXT_FIELDS, texts))
+            )
+    if missing:
+        # Concurrent writers may insert the same lexemes, so conflicts
+        # are ignored and the rows read back
+        Lexeme.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        lexemes.update(Lexeme.objects.in_bulk(missing, field_name='digest'))
+
+    for word, digest, _ in pending:
+        word.lexeme = lexemes[digest]
+        for field in Lexeme.TEXT_FIELDS:
+            setattr(word, 'own_%s' % field, None)
+
+
+def prune_lexemes():
+    """Delete the lexemes no word points at and return their number.
+
+    Edited headwords and deleted words leave their lexemes behind, so
+    this runs periodically like the tombstone pruning.
+    """
+    deleted, _ = Lexeme.objects.filter(words__isnull=True).delete()
+
+    return deleted
@@ -0,0 +1,150 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.lexicon import attach_lexemes
+from core.models import Student, Word, WordSet
+from core.stats import rebuild_stats
+
+
+STEMS = ('voyage', 'harbour', 'lantern', 'meadow', 'thunder', 'whisper',
+         'glacier', 'orchard', 'compass', 'velvet', 'ember', 'quarry')
+
+TRANSLATIONS = ('путешествие', 'гавань', 'фонарь', 'луг', 'гром',
+                'шёпот', 'ледник', 'сад', 'компас', 'бархат', 'уголь',
+                'карьер')
+
+
+class Command(BaseCommand):
+    """Django command filling the database with synthetic data"""
+    help = 'Generate users, students, words and word sets in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--students', type=int, default=1,
+                            help='Students per user')
+        parser.add_argument('--words', type=int, default=500,
+                            help='Words per student')
+        parser.add_argument('--sets', type=int, default=10,
+                            help='Word sets per student')
+        parser.add_argument('--set-size', type=int, default=50)
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _users(self, count, prefix):
+        """Insert the users and return their ids"""
+        User = get_user_model()
+        domain = '@%s.example.com' % prefix
+        if User.objects.filter(email__endswith=domain).exists():
+            raise CommandError(
+                'Data with prefix "%s" already exists' % prefix
+            )
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(email='user%d%s' % (i, domain), password=password)
+            for i in range(count)
+        ], batch_size=self.batch_size)
+
+        return list(User.objects.filter(email__endswith=domain)
+                    .order_by('id').values_list('id', flat=True))
+
+    def _students(self, user_ids, per_user, prefix):
+        """Insert the students and return their ids"""
+        Student.objects.bulk_create([
+            Student(user_id=user_id, tg_id='%s-%d-%d' % (prefix, user_id, i),
+                    first_name='Student %d' % i)
+            for user_id in user_ids
+            for i in range(per_user)
+        ], batch_size=self.batch_size)
+
+        return list(Student.objects.filter(user_id__in=user_ids)
+                    .order_by('id').values_list('id', flat=True))
+
+    def _words(self, student_ids, count):
+        """Insert the words and return their ids by student"""
+        now = timezone.now()
+        words = []
+        for student_id in student_ids:
+            for i in range(count):
+                stem = i % len(STEMS)
+                words.append(Word(
+                    student_id=student_id,
+                    word='%s %d' % (STEMS[stem], i),
+                    translate='%s %d' % (TRANSLATIONS[stem], i),
+                    definition='definition of %s number %d' % (STEMS[stem],
+                                                               i),
+                    example='an example sentence with %s' % STEMS[stem],
+                    due_at=now + timedelta(
+                        minutes=self.random.randint(-43200, 43200)
+                    ),
+                ))
+        attach_lexemes(words)
+        Word.objects.bulk_create(words, batch_size=self.batch_size)
+
+        word_ids = {student_id: [] for student_id in student_ids}
+        rows = Word.objects.filter(student_id__in=student_ids) \
+            .values_list('student_id', 'id')
+        for student_id, word_id in rows.iterator():
+            word_ids[student_id].append(word_id)
+
+        return word_ids
+
+    def _word_sets(self, word_ids, count, size):
+        """Insert the word sets with random members"""
+        WordSet.objects.bulk_create([
+            WordSet(student_id=student_id, name='Set %d' % i)
+            for student_id in word_ids
+            for i in range(count)
+        ], batch_size=self.batch_size)
+
+        Membership = WordSet.words.through
+        memberships = []
+        rows = WordSet.objects.filter(student_id__in=list(word_ids)) \
+            .values_list('student_id', 'id')
+        for student_id, word_set_id in rows.iterator():
+            words = word_ids[student_id]
+            memberships += [
+                Membership(wordset_id=word_set_id, word_id=word_id)
+                for word_id in self.random.sample(words,
+                                                  min(size, len(words)))
+            ]
+        Membership.objects.bulk_create(memberships,
+                                       batch_size=self.batch_size)
+
+        return len(memberships)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        prefix = options['prefix']
+
+        with transaction.atomic():
+            user_ids = self._users(options['users'], prefix)
+            student_ids = self._students(user_ids, options['students'],
+                                         prefix)
+            created = 0
+            chunk = max(1, self.batch_size // max(1, options['words']))
+            for start in range(0, len(student_ids), chunk):
+                word_ids = self._words(student_ids[start:start + chunk],
+                                       options['words'])
+                created += self._word_sets(word_ids, options['sets'],
+                                           options['set_size'])
+                rebuild_stats(*word_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Created %d users, %d students, %d words, %d word sets and '
+            '%d memberships with prefix "%s"' % (
+                len(user_ids),
+                len(student_ids),
+                len(student_ids) * options['words'],
+                len(student_ids) * options['sets'],
+                created,
+                prefix,
+            )
+        ))
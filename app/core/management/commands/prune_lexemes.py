@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.lexicon import prune_lexemes
+
+
+class Command(BaseCommand):
+    """Django command deleting the lexemes no word uses"""
+    help = ('Delete the shared word text left behind by edited and '
+            'deleted words.')
+
+    def handle(self, *args, **options):
+        deleted = prune_lexemes()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d unused lexemes' % deleted
+        ))
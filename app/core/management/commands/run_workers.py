@@ -0,0 +1,144 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection, \
+    connections
+
+from core.jobs import claim_job, requeue_stale_jobs, run_job
+
+
+logger = logging.getLogger(__name__)
+
+STOP_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+
+class Command(BaseCommand):
+    """Django command running background jobs"""
+    help = 'Run background jobs in a pool of processes and threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Worker threads in each process')
+        parser.add_argument('--poll-interval', type=float,
+                            default=settings.JOB_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when no job is due')
+
+    def _work(self, stop, poll_interval, once):
+        """Claim and run jobs until stopped"""
+        processed = 0
+        next_requeue = time.monotonic()
+        try:
+            while not stop.is_set():
+                # Never inside a transaction held by the caller
+                if not connection.in_atomic_block:
+                    close_old_connections()
+                try:
+                    # Jobs of workers dying later are found while running
+                    if time.monotonic() >= next_requeue:
+                        self._requeue_stale_jobs()
+                        next_requeue = time.monotonic() + \
+                            settings.JOB_REQUEUE_INTERVAL
+                    job = claim_job()
+                    if job is not None:
+                        run_job(job)
+                except DatabaseError:
+                    # A job left running is queued again once stale
+                    logger.exception('Database error while running jobs')
+                    connection.close()
+                    stop.wait(poll_interval)
+                    continue
+                if job is None:
+                    if once:
+                        break
+                    stop.wait(poll_interval)
+                    continue
+                processed += 1
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+
+        return processed
+
+    def _requeue_stale_jobs(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            logger.warning('Requeued %d stale jobs', requeued)
+
+    def _run_process(self, threads, poll_interval, once):
+        """Run the worker threads of one process until a signal stops them"""
+        stop = threading.Event()
+        handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in STOP_SIGNALS:
+                handlers[signum] = signal.signal(signum,
+                                                 lambda *args: stop.set())
+            # Signals forwarded before a child got here are delivered now
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        try:
+            if threads == 1:
+                return self._work(stop, poll_interval, once)
+
+            counts = []
+            workers = [
+                threading.Thread(target=lambda: counts.append(
+                    self._work(stop, poll_interval, once)
+                ))
+                for _ in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            return sum(counts)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def _run_processes(self, processes, args):
+        """Run worker processes, passing stop signals on to them"""
+        # Children must open their own database connections
+        connections.close_all()
+        workers = [multiprocessing.Process(target=self._run_process,
+                                           args=args)
+                   for _ in range(processes)]
+
+        def forward(signum, frame):
+            for worker in workers:
+                if worker.pid is not None and worker.exitcode is None:
+                    os.kill(worker.pid, signum)
+
+        handlers = {signum: signal.signal(signum, forward)
+                    for signum in STOP_SIGNALS}
+        try:
+            # Children unblock the signals once their own handlers are set
+            signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+            try:
+                for worker in workers:
+                    worker.start()
+            finally:
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+            for worker in workers:
+                worker.join()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        args = (options['threads'], options['poll_interval'],
+                options['once'])
+        if processes == 1:
+            processed = self._run_process(*args)
+            self.stdout.write('Processed %d jobs' % processed)
+            return
+
+        self._run_processes(processes, args)
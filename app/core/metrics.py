@@ -0,0 +1,164 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return (upper bound, cumulative count) pairs ending with +Inf"""
+        total = 0
+        bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteStats:
+    """Aggregated measurements of one route"""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+        self.response_bytes = 0
+        self.statuses = Counter()
+
+
+def _labels(**labels):
+    return ','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\')
+                                 .replace('"', '\\"'))
+                    for key, value in labels.items())
+
+
+class MetricsRegistry:
+    """In-process request metrics rendered as Prometheus text.
+
+    Apps add gauges and counters of their own with register_collector;
+    a collector returns (name, type, help, [(labels dict, value)]) tuples.
+    """
+
+    def __init__(self):
+        self._routes = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def observe(self, method, route, status, latency, queries, db_time,
+                response_bytes):
+        """Record a finished request, queries being None when unknown"""
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats()
+            stats.latency.observe(latency)
+            if queries is not None:
+                stats.queries.observe(queries)
+            stats.db_time += db_time
+            stats.response_bytes += response_bytes
+            stats.statuses[status] += 1
+
+    def register_collector(self, collector):
+        """Add a callable reporting extra metrics"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self):
+        """Forget all recorded requests"""
+        with self._lock:
+            self._routes.clear()
+
+    def _route_lines(self):
+        lines = []
+        histograms = (
+            ('http_request_duration_seconds', 'latency',
+             'Request latency in seconds'),
+            ('db_queries_per_request', 'queries',
+             'Database queries run by a request'),
+        )
+        for name, attr, description in histograms:
+            lines += ['# HELP %s %s' % (name, description),
+                      '# TYPE %s histogram' % name]
+            for (method, route), stats in sorted(self._routes.items()):
+                histogram = getattr(stats, attr)
+                labels = _labels(method=method, route=route)
+                for bound, count in histogram.cumulative():
+                    lines.append('%s_bucket{%s,le="%s"} %d'
+                                 % (name, labels, bound, count))
+                lines.append('%s_sum{%s} %r' % (name, labels, histogram.sum))
+                lines.append('%s_count{%s} %d'
+                             % (name, labels, histogram.count))
+
+        counters = (
+            ('db_query_duration_seconds_total',
+             'Time spent in database queries',
+             lambda stats: [({}, stats.db_time)]),
+            ('http_response_size_bytes_total',
+             'Bytes of non-streaming response bodies',
+             lambda stats: [({}, stats.response_bytes)]),
+            ('http_requests_total', 'Finished requests by status code',
+             lambda stats: [({'status': status}, count)
+                            for status, count
+                            in sorted(stats.statuses.items())]),
+        )
+        for name, description, values in counters:
+            lines += ['# HELP %s %s' % (name, description),
+                      '# TYPE %s counter' % name]
+            for (method, route), stats in sorted(self._routes.items()):
+                for extra, value in values(stats):
+                    labels = _labels(method=method, route=route, **extra)
+                    lines.append('%s{%s} %r' % (name, labels, value))
+
+        return lines
+
+    def render(self):
+        """Return all metrics in the Prometheus text format"""
+        with self._lock:
+            lines = self._route_lines()
+        for collector in self._collectors:
+            for name, kind, description, samples in collector():
+                lines += ['# HELP %s %s' % (name, description),
+                          '# TYPE %s %s' % (name, kind)]
+                for labels, value in samples:
+                    if labels:
+                        lines.append('%s{%s} %r'
+                                     % (name, _labels(**labels), value))
+                    else:
+                        lines.append('%s %r' % (name, value))
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def cache_collector(name, description, stats):
+    """Return a collector exporting the counters of a cache"""
+    def collect():
+        values = stats()
+        return [
+            ('%s_%s' % (name, key), 'gauge' if key in ('size', 'maxsize',
+                                                       'hit_ratio')
+             else 'counter', '%s %s' % (description, key.replace('_', ' ')),
+             [({}, value)])
+            for key, value in values.items()
+        ]
+
+    return collect
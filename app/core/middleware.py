@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.metrics import registry
+
+
+class QueryCounter:
+    """Execute wrapper counting queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+_request_counter = contextvars.ContextVar('request_query_counter',
+                                          default=None)
+
+
+def count_request_query(execute, sql, params, many, context):
+    """Execute wrapper counting the query for the current async request"""
+    counter = _request_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Add the request query counter to a new database connection"""
+    if count_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_request_query)
+
+
+def route_name(request):
+    """Return a low-cardinality label for the matched route"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+class MetricsMiddleware:
+    """Record latency, queries, response size and status per route.
+
+    Queries are counted on the connections of the request thread. Under
+    ASGI it runs asynchronously so requests are not serialized through
+    the thread for synchronous code; the counter then lives in a context
+    variable, which follows the request into the threads running its
+    queries and is read by a wrapper on every connection.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Let the handler see the instance as a coroutine function
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start,
+                     counter)
+
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _request_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_counter.reset(token)
+        self._record(request, response, time.perf_counter() - start,
+                     counter)
+
+        return response
+
+    def _record(self, request, response, latency, counter):
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(request.method, route_name(request),
+                         response.status_code, latency, counter.count,
+                         counter.duration, size)
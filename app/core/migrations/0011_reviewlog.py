@@ -0,0 +1,31 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_word_review_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quality', models.PositiveSmallIntegerField()),
+                ('correct', models.BooleanField()),
+                ('response_time', models.PositiveIntegerField(blank=True, null=True)),
+                ('reviewed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.word')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reviewlog',
+            index=models.Index(fields=['student', 'reviewed_at'], name='reviewlog_student_time_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+WORD_DOCUMENT = (
+    "to_tsvector('simple', coalesce(word, '') || ' ' || "
+    "coalesce(translate, '') || ' ' || coalesce(definition, ''))"
+)
+
+# Trigram indexes cover the UPPER(...) LIKE that icontains compiles to
+CREATE_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS word_word_trgm_idx '
+    'ON core_word USING gin ((upper(word::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_translate_trgm_idx '
+    'ON core_word USING gin ((upper(translate::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_definition_trgm_idx '
+    'ON core_word USING gin ((upper(definition::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_document_idx '
+    'ON core_word USING gin ((%s))' % WORD_DOCUMENT,
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS word_document_idx',
+    'DROP INDEX IF EXISTS word_definition_trgm_idx',
+    'DROP INDEX IF EXISTS word_translate_trgm_idx',
+    'DROP INDEX IF EXISTS word_word_trgm_idx',
+]
+
+
+def _execute_on_postgres(statements):
+    """Build a migration function running the statements on PostgreSQL"""
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_reviewlog'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _execute_on_postgres(CREATE_SQL),
+            _execute_on_postgres(DROP_SQL)
+        ),
+    ]
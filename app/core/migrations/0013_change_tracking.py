@@ -0,0 +1,45 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_word_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('word', 'Word'), ('wordset', 'Word set')], max_length=16)),
+                ('object_id', models.PositiveIntegerField()),
+                ('student_id', models.PositiveIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='word',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='wordset',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(fields=['student', 'updated_at'], name='word_student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wordset',
+            index=models.Index(fields=['student', 'updated_at'], name='wordset_student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['student_id', 'deleted_at'], name='tombstone_student_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,172 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BATCH_SIZE = 2000
+
+TEXT_FIELDS = ('translate', 'definition', 'example')
+
+OWN_FIELDS = tuple('own_%s' % field for field in TEXT_FIELDS)
+
+# The text now lives on the lexemes, so these indexes cover overrides only
+DROP_SQL = [
+    'DROP INDEX IF EXISTS word_document_idx',
+    'DROP INDEX IF EXISTS word_definition_trgm_idx',
+    'DROP INDEX IF EXISTS word_translate_trgm_idx',
+]
+
+CREATE_SQL = [
+    'CREATE INDEX IF NOT EXISTS word_translate_trgm_idx '
+    'ON core_word USING gin ((upper(translate::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_definition_trgm_idx '
+    'ON core_word USING gin ((upper(definition::text)) gin_trgm_ops)',
+    "CREATE INDEX IF NOT EXISTS word_document_idx ON core_word USING gin "
+    "((to_tsvector('simple', coalesce(word, '') || ' ' || "
+    "coalesce(translate, '') || ' ' || coalesce(definition, ''))))",
+]
+
+
+def _digest(word, translate, definition, example):
+    """Must match core.lexicon.lexeme_digest"""
+    content = json.dumps([word, translate, definition, example],
+                         ensure_ascii=False)
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _word_batches(queryset):
+    """Yield the words of the queryset in batches by primary key"""
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id')
+                     [:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def share_text(apps, schema_editor):
+    """Move the text of every word to a shared lexeme"""
+    Lexeme = apps.get_model('core', 'Lexeme')
+    Word = apps.get_model('core', 'Word')
+    queryset = Word.objects.filter(lexeme__isnull=True).only(
+        'id', 'word', *OWN_FIELDS
+    )
+    for words in _word_batches(queryset):
+        contents = {}
+        for word in words:
+            texts = [getattr(word, own) or '' for own in OWN_FIELDS]
+            digest = _digest(word.word, *texts)
+            contents.setdefault(digest, (word.word, texts))
+            word.digest = digest
+        lexemes = Lexeme.objects.in_bulk(contents, field_name='digest')
+        Lexeme.objects.bulk_create([
+            Lexeme(word=headword, digest=digest,
+                   **dict(zip(TEXT_FIELDS, texts)))
+            for digest, (headword, texts) in contents.items()
+            if digest not in lexemes
+        ], ignore_conflicts=True)
+        lexemes = Lexeme.objects.in_bulk(contents, field_name='digest')
+
+        by_lexeme = {}
+        for word in words:
+            by_lexeme.setdefault(lexemes[word.digest].id, []).append(word.id)
+        for lexeme_id, word_ids in by_lexeme.items():
+            Word.objects.filter(id__in=word_ids).update(
+                lexeme_id=lexeme_id,
+                **dict.fromkeys(OWN_FIELDS)
+            )
+
+
+def copy_text_back(apps, schema_editor):
+    """Store the lexeme text on the words again"""
+    Word = apps.get_model('core', 'Word')
+    queryset = Word.objects.select_related('lexeme')
+    for words in _word_batches(queryset):
+        for word in words:
+            for field, own in zip(TEXT_FIELDS, OWN_FIELDS):
+                if getattr(word, own) is None:
+                    value = getattr(word.lexeme, field) if word.lexeme \
+                        else ''
+                    setattr(word, own, value)
+        Word.objects.bulk_update(words, OWN_FIELDS, batch_size=500)
+
+
+def _execute_on_postgres(statements):
+    """Build a migration function running the statements on PostgreSQL"""
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+def _own_text(field):
+    """Keep the column of a text field under its override name"""
+    return migrations.SeparateDatabaseAndState(state_operations=[
+        migrations.RenameField(
+            model_name='word',
+            old_name=field,
+            new_name='own_%s' % field,
+        ),
+        migrations.AlterField(
+            model_name='word',
+            name='own_%s' % field,
+            field=models.TextField(blank=True, db_column=field),
+        ),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_student_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lexeme',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=255)),
+                ('translate', models.TextField(blank=True)),
+                ('definition', models.TextField(blank=True)),
+                ('example', models.TextField(blank=True)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='word',
+            name='lexeme',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='words', to='core.lexeme'),
+        ),
+        _own_text('translate'),
+        _own_text('definition'),
+        _own_text('example'),
+        migrations.AlterField(
+            model_name='word',
+            name='own_translate',
+            field=models.TextField(blank=True, db_column='translate', null=True),
+        ),
+        migrations.AlterField(
+            model_name='word',
+            name='own_definition',
+            field=models.TextField(blank=True, db_column='definition', null=True),
+        ),
+        migrations.AlterField(
+            model_name='word',
+            name='own_example',
+            field=models.TextField(blank=True, db_column='example', null=True),
+        ),
+        migrations.RunPython(share_text, copy_text_back),
+        migrations.RunPython(
+            _execute_on_postgres(DROP_SQL),
+            _execute_on_postgres(CREATE_SQL)
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:49
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+import django.utils.timezone
+
+
+BATCH_SIZE = 2000
+
+
+def count_rows(apps, schema_editor):
+    """Fill the counters and the review activity from the existing rows"""
+    Student = apps.get_model('core', 'Student')
+    Word = apps.get_model('core', 'Word')
+    WordSet = apps.get_model('core', 'WordSet')
+    ReviewLog = apps.get_model('core', 'ReviewLog')
+    StudentStats = apps.get_model('core', 'StudentStats')
+    DailyActivity = apps.get_model('core', 'DailyActivity')
+
+    totals = defaultdict(Counter)
+    learned = Q(interval__gte=settings.TRAINER_LEARNED_INTERVAL)
+    words = Word.objects.values('student_id').annotate(
+        words=Count('id'),
+        reviewed_words=Count('id', filter=Q(reviewed_at__isnull=False)),
+        learned_words=Count('id', filter=learned),
+    ).order_by()
+    word_sets = WordSet.objects.values('student_id').annotate(
+        word_sets=Count('id')
+    ).order_by()
+    reviews = ReviewLog.objects.values('student_id').annotate(
+        reviews=Count('id'),
+        correct_reviews=Count('id', filter=Q(correct=True)),
+    ).order_by()
+    for rows in (words, word_sets, reviews):
+        for row in rows:
+            totals[row.pop('student_id')].update(row)
+
+    now = django.utils.timezone.now()
+    StudentStats.objects.bulk_create((
+        StudentStats(student_id=pk, updated_at=now, **totals[pk])
+        for pk in Student.objects.values_list('id', flat=True).iterator()
+    ), batch_size=BATCH_SIZE)
+
+    days = ReviewLog.objects.annotate(
+        day=TruncDate('reviewed_at')
+    ).values('student_id', 'day').annotate(
+        reviews=Count('id'),
+        correct_reviews=Count('id', filter=Q(correct=True)),
+    ).order_by()
+    DailyActivity.objects.bulk_create((
+        DailyActivity(**row) for row in days.iterator()
+    ), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.student')),
+                ('words', models.PositiveIntegerField(default=0)),
+                ('word_sets', models.PositiveIntegerField(default=0)),
+                ('reviewed_words', models.PositiveIntegerField(default=0)),
+                ('learned_words', models.PositiveIntegerField(default=0)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('correct_reviews', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('words_added', models.PositiveIntegerField(default=0)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('correct_reviews', models.PositiveIntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyactivity',
+            constraint=models.UniqueConstraint(fields=('student', 'day'), name='daily_activity_student_day'),
+        ),
+        migrations.RunPython(count_rows, migrations.RunPython.noop),
+    ]
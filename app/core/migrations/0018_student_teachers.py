@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_student_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='students',
+            field=models.ManyToManyField(blank=True, related_name='teachers', to='core.Student'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+# Must match the SearchVector over the search fields in trainer.search
+DOCUMENT = (
+    "to_tsvector('simple'::regconfig, coalesce(word, '') || ' ' || "
+    "coalesce(translate, '') || ' ' || coalesce(definition, ''))"
+)
+
+
+# The lexemes hold most of the text and the word columns the overrides
+CREATE_SQL = [
+    'CREATE INDEX IF NOT EXISTS lexeme_translate_trgm_idx '
+    'ON core_lexeme USING gin ((upper(translate::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS lexeme_definition_trgm_idx '
+    'ON core_lexeme USING gin ((upper(definition::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS lexeme_document_idx '
+    'ON core_lexeme USING gin ((%s))' % DOCUMENT,
+    'CREATE INDEX IF NOT EXISTS word_translate_trgm_idx '
+    'ON core_word USING gin ((upper(translate::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_definition_trgm_idx '
+    'ON core_word USING gin ((upper(definition::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS word_document_idx '
+    'ON core_word USING gin ((%s))' % DOCUMENT,
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS word_document_idx',
+    'DROP INDEX IF EXISTS word_definition_trgm_idx',
+    'DROP INDEX IF EXISTS word_translate_trgm_idx',
+    'DROP INDEX IF EXISTS lexeme_document_idx',
+    'DROP INDEX IF EXISTS lexeme_definition_trgm_idx',
+    'DROP INDEX IF EXISTS lexeme_translate_trgm_idx',
+]
+
+
+def _execute_on_postgres(statements):
+    """Build a migration function running the statements on PostgreSQL"""
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_student_teachers'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _execute_on_postgres(CREATE_SQL),
+            _execute_on_postgres(DROP_SQL)
+        ),
+    ]
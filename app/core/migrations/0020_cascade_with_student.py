@@ -0,0 +1,24 @@
+# Generated by Django 3.1.14 on 2026-10-18 17:11
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_lexeme_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='word',
+            name='student',
+            field=models.ForeignKey(on_delete=core.models.cascade_with_student, to='core.student'),
+        ),
+        migrations.AlterField(
+            model_name='wordset',
+            name='student',
+            field=models.ForeignKey(on_delete=core.models.cascade_with_student, to='core.student'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_cascade_with_student'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reviewlog',
+            name='word',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='core.word'),
+        ),
+    ]
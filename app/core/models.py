@@ -2,6 +2,9 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
 from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -48,25 +51,124 @@ class Student(models.Model):
     language_code = models.CharField(max_length=64, default='')
     is_student = models.BooleanField(default=True)
     is_teacher = models.BooleanField(default=False)
+    data_version = models.PositiveIntegerField(default=0)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    students = models.ManyToManyField(
+        'self',
+        symmetrical=False,
+        related_name='teachers',
+        blank=True,
+    )
 
     def __str__(self):
         return self.tg_id
 
 
-class Word(models.Model):
-    """Word for students"""
+class Lexeme(models.Model):
+    """Word text shared by every student who saved the same entry"""
     word = models.CharField(max_length=255)
     translate = models.TextField(blank=True)
     definition = models.TextField(blank=True)
     example = models.TextField(blank=True)
+    digest = models.CharField(max_length=64, unique=True)
+
+    TEXT_FIELDS = ('translate', 'definition', 'example')
+
+    def __str__(self):
+        return self.word
+
+
+class WordQuerySet(models.QuerySet):
+
+    def with_text(self):
+        """Annotate the text fields resolved against the lexemes"""
+        if 'translate' in self.query.annotations:
+            return self
+
+        return self.annotate(**{
+            field: Coalesce(
+                'own_%s' % field,
+                'lexeme__%s' % field,
+                Value(''),
+                output_field=models.TextField()
+            )
+            for field in Lexeme.TEXT_FIELDS
+        })
+
+
+def _lexeme_text(field):
+    """Return a property reading the own text or the lexeme one"""
+    own = 'own_%s' % field
+
+    def get_text(self):
+        value = getattr(self, own)
+        if value is None:
+            if self.lexeme_id is None:
+                return ''
+            return getattr(self.lexeme, field)
+
+        return value
+
+    def set_text(self, value):
+        setattr(self, own, value)
+
+    return property(get_text, set_text)
+
+
+def cascade_with_student(collector, field, sub_objs, using):
+    """Cascade like CASCADE, flagging rows deleted with their student.
+
+    Receivers skip the per row bookkeeping of flagged rows, since the
+    counters, versions and tombstones of the student go away with it.
+    """
+    for obj in sub_objs:
+        obj._deleted_with_student = True
+    models.CASCADE(collector, field, sub_objs, using)
+
+
+class Word(models.Model):
+    """Word for students"""
+    word = models.CharField(max_length=255)
+    lexeme = models.ForeignKey(
+        Lexeme,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='words',
+    )
+    own_translate = models.TextField(null=True, blank=True,
+                                     db_column='translate')
+    own_definition = models.TextField(null=True, blank=True,
+                                      db_column='definition')
+    own_example = models.TextField(null=True, blank=True,
+                                   db_column='example')
     student = models.ForeignKey(
         Student,
-        on_delete=models.CASCADE,
+        on_delete=cascade_with_student,
     )
+    ease = models.FloatField(default=2.5)
+    interval = models.PositiveIntegerField(default=0)
+    repetitions = models.PositiveIntegerField(default=0)
+    due_at = models.DateTimeField(default=timezone.now)
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = WordQuerySet.as_manager()
+
+    translate = _lexeme_text('translate')
+    definition = _lexeme_text('definition')
+    example = _lexeme_text('example')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'due_at'],
+                         name='word_student_due_idx'),
+            models.Index(fields=['student', 'updated_at'],
+                         name='word_student_updated_idx'),
+        ]
 
     def __str__(self):
         return self.word
@@ -77,9 +179,153 @@ class WordSet(models.Model):
     name = models.CharField(max_length=255)
     student = models.ForeignKey(
         Student,
-        on_delete=models.CASCADE
+        on_delete=cascade_with_student
     )
     words = models.ManyToManyField('Word')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'updated_at'],
+                         name='wordset_student_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ReviewLog(models.Model):
+    """Answer given by a student while reviewing a word"""
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE
+    )
+    # Kept when the word is deleted, so the review counters of the
+    # student can always be recounted from the log. Without a constraint
+    # deleting words does no work on their logs.
+    word = models.ForeignKey(
+        Word,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    quality = models.PositiveSmallIntegerField()
+    correct = models.BooleanField()
+    response_time = models.PositiveIntegerField(null=True, blank=True)
+    reviewed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'reviewed_at'],
+                         name='reviewlog_student_time_idx'),
+        ]
+
+    def __str__(self):
+        return '%s: %s' % (self.word_id, self.quality)
+
+
+class Tombstone(models.Model):
+    """Record of a deleted word or word set for delta sync"""
+    WORD = 'word'
+    WORD_SET = 'wordset'
+    KIND_CHOICES = (
+        (WORD, 'Word'),
+        (WORD_SET, 'Word set'),
+    )
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    student_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'deleted_at'],
+                         name='tombstone_student_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return '%s %s' % (self.kind, self.object_id)
+
+
+class Job(models.Model):
+    """Background job run by the run_workers command"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES,
+                              default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], name='job_queued_idx',
+                         condition=models.Q(status='queued')),
+            models.Index(fields=['started_at'], name='job_running_idx',
+                         condition=models.Q(status='running')),
+        ]
+
+    def __str__(self):
+        return '%s %s' % (self.kind, self.status)
+
+
+class StudentStats(models.Model):
+    """Running totals of a student kept up to date by the write paths"""
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    words = models.PositiveIntegerField(default=0)
+    word_sets = models.PositiveIntegerField(default=0)
+    reviewed_words = models.PositiveIntegerField(default=0)
+    learned_words = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    correct_reviews = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return str(self.student_id)
+
+
+class DailyActivity(models.Model):
+    """Words added and answers given by a student on one day"""
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    words_added = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    correct_reviews = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'day'],
+                                    name='daily_activity_student_day'),
+        ]
+
+    def __str__(self):
+        return '%s %s' % (self.student_id, self.day)
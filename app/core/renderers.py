@@ -0,0 +1,58 @@
+import msgpack
+from django.http.multipartparser import parse_header
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+ROWS_LAYOUT = 'rows'
+
+
+def _default(obj):
+    """Convert what msgpack cannot pack the way the JSON renderer does"""
+    return encoders.JSONEncoder().default(obj)
+
+
+def _to_rows(items):
+    """Return a list of uniform dicts as columns and value rows"""
+    columns = list(items[0].keys()) if items else []
+
+    return {
+        'columns': columns,
+        'rows': [[item[column] for column in columns] for item in items],
+    }
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer which serializes to MessagePack.
+
+    Views setting ``msgpack_rows = True`` render lists of objects as
+    columns and rows when the client asks for the ``layout=rows``
+    media type parameter.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def _wants_rows(self, accepted_media_type, renderer_context):
+        view = renderer_context.get('view')
+        if not getattr(view, 'msgpack_rows', False) or not accepted_media_type:
+            return False
+        _, params = parse_header(accepted_media_type.encode('ascii'))
+
+        return params.get('layout', b'').decode() == ROWS_LAYOUT
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if (response is not None and response.status_code < 400
+                and self._wants_rows(accepted_media_type, renderer_context)):
+            if isinstance(data, list):
+                data = _to_rows(data)
+            elif isinstance(data.get('results'), list):
+                data = dict(data)
+                data.update(_to_rows(data.pop('results')))
+
+        return msgpack.packb(data, default=_default, use_bin_type=True)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core.cache import LRUCache
+from core.models import Student
+
+
+STUDENT_KEY = 'student:tg_id:%s'
+
+student_cache = LRUCache(
+    maxsize=settings.STUDENT_CACHE_MAXSIZE,
+    ttl=settings.STUDENT_CACHE_TTL
+)
+
+
+def _shared_cache():
+    """Return the optional Django cache shared between processes"""
+    if not settings.STUDENT_CACHE_BACKEND:
+        return None
+
+    return caches[settings.STUDENT_CACHE_BACKEND]
+
+
+def _lookup(tg_id):
+    return Student.objects.filter(
+        tg_id=tg_id
+    ).values_list('id', flat=True).first()
+
+
+def resolve_student_id(tg_id):
+    """Return the id of the student with the telegram id or None.
+
+    With STUDENT_CACHE_BACKEND set, resolutions are kept only in that
+    cache, where the signals of any process clear them. Without it they
+    are kept in an in-process LRU, and other processes may resolve a
+    changed tg_id to its previous student for up to STUDENT_CACHE_TTL.
+    """
+    shared = _shared_cache()
+    if shared is None:
+        student_id = student_cache.get(tg_id)
+        if student_id is None:
+            student_id = _lookup(tg_id)
+            if student_id is not None:
+                student_cache.set(tg_id, student_id)
+
+        return student_id
+
+    key = STUDENT_KEY % tg_id
+    student_id = shared.get(key)
+    if student_id is None:
+        student_id = _lookup(tg_id)
+        if student_id is not None:
+            shared.set(key, student_id, settings.STUDENT_CACHE_TTL)
+
+    return student_id
+
+
+def forget_student(tg_id, student_id=None):
+    """Drop the cached resolution of the telegram id.
+
+    The shared entry is dropped again once the transaction commits, so
+    a resolution read from the old row meanwhile is not kept.
+    """
+    student_cache.delete(tg_id)
+    if student_id is not None:
+        student_cache.delete_where(lambda value: value == student_id)
+
+    shared = _shared_cache()
+    if shared is not None:
+        key = STUDENT_KEY % tg_id
+        shared.delete(key)
+        transaction.on_commit(lambda: shared.delete(key))
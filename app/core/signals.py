@@ -0,0 +1,216 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.lexicon import attach_lexemes
+from core.models import Student, StudentStats, Tombstone, Word, \
+    WordSet
+from core.resolvers import forget_student
+from core.stats import add_activity, add_to_stats, subtract, \
+    word_counters
+from core.versions import bump_data_version
+
+
+@receiver(pre_save, sender=Student)
+def forget_previous_tg_id(sender, instance, **kwargs):
+    """Drop the old telegram id of a student being changed"""
+    if instance.pk is None:
+        return
+    old_tg_id = Student.objects.filter(
+        pk=instance.pk
+    ).values_list('tg_id', flat=True).first()
+    if old_tg_id is not None and old_tg_id != instance.tg_id:
+        forget_student(old_tg_id, instance.pk)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def forget_saved_student(sender, instance, **kwargs):
+    """Keep the telegram id resolver consistent with the table"""
+    forget_student(instance.tg_id, instance.pk)
+
+
+@receiver(m2m_changed, sender=WordSet.words.through)
+def touch_changed_word_sets(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """Mark word sets as updated when their words change"""
+    if reverse:
+        if action == 'pre_clear':
+            word_set_ids = instance.wordset_set.values_list('id', flat=True)
+        elif action in ('post_add', 'post_remove'):
+            word_set_ids = pk_set
+        else:
+            return
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        word_set_ids = [instance.pk]
+    else:
+        return
+
+    WordSet.objects.filter(
+        pk__in=list(word_set_ids)
+    ).update(updated_at=timezone.now())
+
+
+def deleted_with_student(instance):
+    """Return whether the row is deleted along with its student"""
+    return getattr(instance, '_deleted_with_student', False)
+
+
+@receiver(pre_delete, sender=Word)
+def touch_word_sets_of_deleted_word(sender, instance, **kwargs):
+    """Mark word sets as updated when one of their words is deleted"""
+    if deleted_with_student(instance):
+        return
+    WordSet.objects.filter(words=instance).update(updated_at=timezone.now())
+
+
+def _tombstone_kind(sender):
+    return Tombstone.WORD if sender is Word else Tombstone.WORD_SET
+
+
+@receiver(post_delete, sender=Word)
+@receiver(post_delete, sender=WordSet)
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deleted words and word sets for delta sync"""
+    if deleted_with_student(instance):
+        return
+    Tombstone.objects.create(
+        kind=_tombstone_kind(sender),
+        object_id=instance.pk,
+        student_id=instance.student_id
+    )
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_save, sender=WordSet)
+def record_moved_tombstone(sender, instance, raw=False, **kwargs):
+    """Remember words and word sets moved away for the old owner sync"""
+    previous = getattr(instance, '_previous_state', None)
+    if raw or previous is None \
+            or previous['student_id'] == instance.student_id:
+        return
+    kind = _tombstone_kind(sender)
+    # A row moved back is no longer deleted for its new owner
+    Tombstone.objects.filter(
+        kind=kind,
+        object_id=instance.pk,
+        student_id=instance.student_id
+    ).delete()
+    Tombstone.objects.create(
+        kind=kind,
+        object_id=instance.pk,
+        student_id=previous['student_id']
+    )
+
+
+@receiver(pre_save, sender=Word)
+@receiver(pre_save, sender=WordSet)
+def bump_previous_student_version(sender, instance, **kwargs):
+    """Bump the version of a student losing a word or word set"""
+    instance._previous_state = None
+    if instance.pk is None:
+        return
+    fields = ('student_id', 'reviewed_at', 'interval') if sender is Word \
+        else ('student_id', )
+    instance._previous_state = sender.objects.filter(
+        pk=instance.pk
+    ).values(*fields).first()
+    old_student_id = (instance._previous_state or {}).get('student_id')
+    if old_student_id not in (None, instance.student_id):
+        bump_data_version(old_student_id)
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+@receiver(post_save, sender=WordSet)
+@receiver(post_delete, sender=WordSet)
+def bump_student_version(sender, instance, **kwargs):
+    """Bump the version of the student owning a changed row"""
+    if deleted_with_student(instance):
+        return
+    bump_data_version(instance.student_id)
+
+
+@receiver(m2m_changed, sender=WordSet.words.through)
+def bump_word_set_student_version(sender, instance, action, **kwargs):
+    """Bump the version of the student when set memberships change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_data_version(instance.student_id)
+
+
+@receiver(pre_save, sender=Word)
+def share_lexeme(sender, instance, update_fields=None, **kwargs):
+    """Store the text of a word in the shared lexicon"""
+    if update_fields is None:
+        attach_lexemes([instance])
+
+
+@receiver(post_save, sender=Student)
+def create_student_stats(sender, instance, created, raw=False, **kwargs):
+    """Start the counters of a new student"""
+    if created and not raw:
+        StudentStats.objects.create(student=instance)
+
+
+def _counters(sender, state):
+    """Return the counters a word or word set in the state adds"""
+    if state is None:
+        return {}
+    if sender is WordSet:
+        return {'word_sets': 1}
+
+    return word_counters(state['reviewed_at'], state['interval'])
+
+
+def _current_state(instance):
+    """Return the state of a word or word set as saved in the row"""
+    return {
+        'student_id': instance.student_id,
+        'reviewed_at': getattr(instance, 'reviewed_at', None),
+        'interval': getattr(instance, 'interval', 0),
+    }
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_save, sender=WordSet)
+def count_saved_row(sender, instance, created, raw=False, **kwargs):
+    """Move the counters of a saved word or word set"""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    old = _counters(sender, previous)
+    new = _counters(sender, _current_state(instance))
+    if previous is None or previous['student_id'] == instance.student_id:
+        add_to_stats(instance.student_id, **subtract(new, old))
+    else:
+        add_to_stats(previous['student_id'], **subtract({}, old))
+        add_to_stats(instance.student_id, **new)
+    if created and sender is Word:
+        add_activity(instance.student_id, words_added=1)
+
+
+@receiver(pre_delete, sender=Word)
+def remember_deleted_word_state(sender, instance, **kwargs):
+    """Read the schedule of a word being deleted from its row.
+
+    The instance may be older than a review that changed the row.
+    """
+    instance._deleted_state = None
+    if deleted_with_student(instance):
+        return
+    instance._deleted_state = Word.objects.filter(
+        pk=instance.pk
+    ).values('student_id', 'reviewed_at', 'interval').first()
+
+
+@receiver(post_delete, sender=Word)
+@receiver(post_delete, sender=WordSet)
+def count_deleted_row(sender, instance, **kwargs):
+    """Take a deleted word or word set out of the counters"""
+    if deleted_with_student(instance):
+        return
+    state = getattr(instance, '_deleted_state', None) \
+        or _current_state(instance)
+    old = _counters(sender, state)
+    add_to_stats(state['student_id'], **subtract({}, old))
@@ -0,0 +1,124 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import DailyActivity, ReviewLog, Student, StudentStats, \
+    Word, WordSet
+
+
+def word_counters(reviewed_at, interval):
+    """Return the counters a word with the given schedule adds"""
+    return Counter(
+        words=1,
+        reviewed_words=int(reviewed_at is not None),
+        learned_words=int(interval >= settings.TRAINER_LEARNED_INTERVAL),
+    )
+
+
+def subtract(new, old):
+    """Return the non zero differences between two counters"""
+    return {
+        key: new.get(key, 0) - old.get(key, 0)
+        for key in set(new) | set(old)
+        if new.get(key, 0) != old.get(key, 0)
+    }
+
+
+def add_to_stats(*student_ids, **deltas):
+    """Apply the same deltas to the counters of the students"""
+    student_ids = {pk for pk in student_ids if pk is not None}
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not student_ids or not deltas:
+        return
+    StudentStats.objects.filter(student_id__in=student_ids).update(
+        updated_at=timezone.now(),
+        **{key: F(key) + value for key, value in deltas.items()}
+    )
+
+
+def add_activity(*student_ids, **deltas):
+    """Apply the same deltas to the activity of the students today"""
+    student_ids = {pk for pk in student_ids if pk is not None}
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not student_ids or not deltas:
+        return
+    day = timezone.localdate()
+    DailyActivity.objects.bulk_create([
+        DailyActivity(student_id=pk, day=day) for pk in student_ids
+    ], ignore_conflicts=True)
+    DailyActivity.objects.filter(student_id__in=student_ids, day=day).update(
+        **{key: F(key) + value for key, value in deltas.items()}
+    )
+
+
+def rebuild_stats(*student_ids):
+    """Recount the totals of the students from their rows"""
+    student_ids = set(student_ids)
+    totals = defaultdict(Counter)
+    learned = Q(interval__gte=settings.TRAINER_LEARNED_INTERVAL)
+    words = Word.objects.filter(student_id__in=student_ids).values(
+        'student_id'
+    ).annotate(
+        words=Count('id'),
+        reviewed_words=Count('id', filter=Q(reviewed_at__isnull=False)),
+        learned_words=Count('id', filter=learned),
+    ).order_by()
+    word_sets = WordSet.objects.filter(student_id__in=student_ids).values(
+        'student_id'
+    ).annotate(word_sets=Count('id')).order_by()
+    reviews = ReviewLog.objects.filter(student_id__in=student_ids).values(
+        'student_id'
+    ).annotate(
+        reviews=Count('id'),
+        correct_reviews=Count('id', filter=Q(correct=True)),
+    ).order_by()
+    for rows in (words, word_sets, reviews):
+        for row in rows:
+            totals[row.pop('student_id')].update(row)
+
+    now = timezone.now()
+    with transaction.atomic():
+        StudentStats.objects.filter(student_id__in=student_ids).delete()
+        StudentStats.objects.bulk_create([
+            StudentStats(student_id=pk, updated_at=now, **totals[pk])
+            for pk in student_ids
+        ], batch_size=settings.TRAINER_BULK_BATCH_SIZE)
+
+
+def _activity_total(field, since):
+    """Return a subquery summing an activity field of the outer student"""
+    totals = DailyActivity.objects.filter(
+        student_id=OuterRef('pk'),
+        day__gte=since
+    ).values('student_id').annotate(total=Sum(field)).values('total')
+
+    return Coalesce(Subquery(totals), 0)
+
+
+def class_overview(teacher_id, since):
+    """Return the students of a teacher with their counters and activity
+
+    Every counter is an annotation, so the whole class is read with one
+    query whatever its size.
+    """
+    last_review = ReviewLog.objects.filter(
+        student_id=OuterRef('pk')
+    ).order_by('-reviewed_at').values('reviewed_at')[:1]
+
+    return Student.objects.filter(teachers=teacher_id).annotate(
+        words=Coalesce('stats__words', 0),
+        word_sets=Coalesce('stats__word_sets', 0),
+        learned_words=Coalesce('stats__learned_words', 0),
+        words_added=_activity_total('words_added', since),
+        reviews=_activity_total('reviews', since),
+        correct_reviews=_activity_total('correct_reviews', since),
+        last_reviewed_at=Subquery(last_review),
+    ).order_by('id').values(
+        'id', 'tg_id', 'first_name', 'last_name', 'username', 'words',
+        'word_sets', 'learned_words', 'words_added', 'reviews',
+        'correct_reviews', 'last_reviewed_at'
+    )
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.cache import LRUCache
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_get_counts_hits_and_misses(self):
+        """Test that lookups update the hit and miss counters"""
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used key is dropped first"""
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    @patch('core.cache.time.monotonic')
+    def test_expired_entries_are_missed(self, monotonic):
+        """Test that entries older than the ttl are not returned"""
+        cache = LRUCache(maxsize=2, ttl=10)
+        monotonic.return_value = 100
+        cache.set('a', 1)
+        monotonic.return_value = 111
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_delete_where(self):
+        """Test removing entries by their value"""
+        cache = LRUCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.delete_where(lambda value: value == 2)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
@@ -1,9 +1,14 @@
+from io import StringIO
 from unittest.mock import patch
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import TestCase
 
+from core.models import Lexeme, Student, Word, WordSet
+
 
 class CommandTests(TestCase):
 
@@ -21,3 +26,37 @@ class CommandTests(TestCase):
             gi.side_effect = [OperationalError] * 5 + [True]
             call_command('wait_for_db')
             self.assertEqual(gi.call_count, 6)
+
+    def test_generate_data(self):
+        """Test synthetic data is inserted with the requested shape"""
+        call_command('generate_data', users=3, students=2, words=20,
+                     sets=2, set_size=5, prefix='gen', batch_size=50,
+                     stdout=StringIO())
+
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertEqual(Student.objects.count(), 6)
+        self.assertEqual(Word.objects.count(), 120)
+        self.assertEqual(WordSet.objects.count(), 12)
+        for word_set in WordSet.objects.prefetch_related('words'):
+            self.assertEqual(len(word_set.words.all()), 5)
+            for word in word_set.words.all():
+                self.assertEqual(word.student_id, word_set.student_id)
+
+    def test_generate_data_refuses_existing_prefix(self):
+        """Test generating twice with one prefix fails"""
+        call_command('generate_data', users=1, words=1, sets=0,
+                     prefix='gen', stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_data', users=1, prefix='gen',
+                         stdout=StringIO())
+
+    def test_prune_lexemes(self):
+        """Test that the command deletes lexemes without words"""
+        Lexeme.objects.create(word='voyage', digest='unused')
+        out = StringIO()
+
+        call_command('prune_lexemes', stdout=out)
+
+        self.assertIn('Deleted 1 unused lexemes', out.getvalue())
+        self.assertFalse(Lexeme.objects.exists())
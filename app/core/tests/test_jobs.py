@@ -0,0 +1,162 @@
+import os
+import signal
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, \
+    override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+
+calls = []
+
+
+@jobs.register('test_echo')
+def echo_job(payload):
+    calls.append(payload)
+    if 'strand' in payload:
+        # Leave a job running as if its worker had died
+        Job.objects.filter(pk=payload['strand']).update(
+            status=Job.RUNNING,
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+    if payload.get('fail'):
+        raise RuntimeError('boom')
+
+    return {'echo': payload}
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_requires_a_handler(self):
+        """Test that unknown job kinds are refused"""
+        with self.assertRaises(ValueError):
+            jobs.enqueue('no_such_kind', {})
+
+    def test_claim_takes_due_jobs_in_order(self):
+        """Test that jobs are claimed once, oldest first"""
+        later = jobs.enqueue('test_echo', {'n': 2})
+        Job.objects.filter(pk=later.pk).update(
+            run_after=timezone.now() + timedelta(hours=1)
+        )
+        first = jobs.enqueue('test_echo', {'n': 1})
+        second = jobs.enqueue('test_echo', {'n': 3})
+
+        self.assertEqual(jobs.claim_job().pk, first.pk)
+        self.assertEqual(jobs.claim_job().pk, second.pk)
+        self.assertIsNone(jobs.claim_job())
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertEqual(first.attempts, 1)
+
+    def test_run_job_records_result(self):
+        """Test that a finished job stores what the handler returned"""
+        jobs.enqueue('test_echo', {'n': 1})
+        job = jobs.run_job(jobs.claim_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, {'echo': {'n': 1}})
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=0)
+    def test_failed_job_is_retried_then_failed(self):
+        """Test that a failing job is retried up to the attempt limit"""
+        jobs.enqueue('test_echo', {'fail': True})
+
+        job = jobs.run_job(jobs.claim_job())
+        self.assertEqual(job.status, Job.QUEUED)
+        job = jobs.run_job(jobs.claim_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn('RuntimeError: boom', job.error)
+        self.assertIsNone(jobs.claim_job())
+
+    @override_settings(JOB_STALE_TIMEOUT=60)
+    def test_stale_running_jobs_are_requeued(self):
+        """Test that jobs of a lost worker are queued again"""
+        job = jobs.enqueue('test_echo', {})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(jobs.claim_job().pk, job.pk)
+
+    @override_settings(JOB_STALE_TIMEOUT=60, JOB_MAX_ATTEMPTS=3)
+    def test_stale_job_out_of_attempts_fails(self):
+        """Test that a lost job with no attempts left is not requeued"""
+        job = jobs.enqueue('test_echo', {})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING,
+            attempts=3,
+            started_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        self.assertIsNone(jobs.claim_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIsNotNone(job.finished_at)
+        self.assertIn('Worker lost', job.error)
+
+    def test_run_workers_once(self):
+        """Test that the command drains the queue and exits"""
+        for n in range(3):
+            jobs.enqueue('test_echo', {'n': n})
+        out = StringIO()
+
+        call_command('run_workers', once=True, stdout=out)
+
+        self.assertIn('Processed 3 jobs', out.getvalue())
+        self.assertEqual(calls, [{'n': 0}, {'n': 1}, {'n': 2}])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+    @override_settings(JOB_STALE_TIMEOUT=60, JOB_REQUEUE_INTERVAL=0)
+    def test_run_workers_requeues_while_polling(self):
+        """Test that jobs of workers dying later are queued again"""
+        stranded = jobs.enqueue('test_echo', {'n': 2})
+        Job.objects.filter(pk=stranded.pk).update(
+            run_after=timezone.now() + timedelta(seconds=1)
+        )
+        jobs.enqueue('test_echo', {'strand': stranded.pk})
+        Job.objects.filter(pk=stranded.pk).update(run_after=timezone.now())
+        out = StringIO()
+
+        call_command('run_workers', once=True, stdout=out)
+
+        self.assertIn('Processed 2 jobs', out.getvalue())
+        self.assertEqual(calls, [{'strand': stranded.pk}, {'n': 2}])
+
+
+class RunWorkerProcessTests(TransactionTestCase):
+    """Test worker processes, which close the connections of the parent"""
+
+    def test_run_workers_forwards_sigterm(self):
+        """Test that stopping the parent stops the worker processes"""
+        def work(command, stop, poll_interval, once):
+            os.kill(os.getppid(), signal.SIGTERM)
+            if not stop.wait(30):
+                os._exit(1)
+
+            return 0
+
+        started = time.monotonic()
+        with patch('core.management.commands.run_workers.Command._work',
+                   work):
+            call_command('run_workers', processes=2)
+
+        self.assertLess(time.monotonic() - started, 10)
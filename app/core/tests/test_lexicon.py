@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.lexicon import attach_lexemes, prune_lexemes
+from core.models import Lexeme, Student, Word
+
+
+class LexiconTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user('test@ya.ru', 'pass')
+        self.student = Student.objects.create(user=user, tg_id='1')
+        self.other = Student.objects.create(user=user, tg_id='2')
+
+    def test_same_entries_share_a_lexeme(self):
+        """Test that identical words of two students share the text"""
+        first = Word.objects.create(student=self.student, word='voyage',
+                                    translate='trip')
+        second = Word.objects.create(student=self.other, word='voyage',
+                                     translate='trip')
+
+        self.assertEqual(Lexeme.objects.count(), 1)
+        self.assertEqual(first.lexeme_id, second.lexeme_id)
+        self.assertIsNone(first.own_translate)
+        self.assertEqual(first.translate, 'trip')
+
+    def test_edit_is_kept_as_override(self):
+        """Test that editing the text of a shared word overrides it"""
+        Word.objects.create(student=self.other, word='voyage',
+                            translate='trip')
+        word = Word.objects.create(student=self.student, word='voyage',
+                                   translate='trip')
+        word = Word.objects.with_text().get(pk=word.pk)
+        word.translate = 'journey'
+        word.save()
+
+        stored = Word.objects.values('own_translate', 'own_definition') \
+            .get(pk=word.pk)
+        self.assertEqual(stored, {'own_translate': 'journey',
+                                  'own_definition': None})
+        self.assertEqual(Lexeme.objects.count(), 1)
+        self.assertEqual(
+            Word.objects.with_text().get(student=self.other).translate,
+            'trip'
+        )
+
+    def test_changed_headword_moves_to_another_lexeme(self):
+        """Test that renaming a word points it at a matching lexeme"""
+        word = Word.objects.create(student=self.student, word='voyage',
+                                   translate='trip')
+        word.word = 'journey'
+        word.save()
+
+        word.refresh_from_db()
+        self.assertEqual(word.lexeme.word, 'journey')
+        self.assertEqual(word.translate, 'trip')
+        self.assertEqual(Lexeme.objects.count(), 2)
+
+    def test_attach_lexemes_queries_do_not_grow(self):
+        """Test that attaching many words uses a fixed number of queries"""
+        Lexeme.objects.create(word='w0', digest='unused')
+        words = [Word(student=self.student, word='w%d' % i,
+                      translate='t%d' % (i % 5))
+                 for i in range(40)]
+
+        with self.assertNumQueries(3):
+            attach_lexemes(words)
+
+        self.assertEqual(Lexeme.objects.count(), 41)
+        self.assertTrue(all(word.own_translate is None for word in words))
+        self.assertEqual(words[7].translate, 't2')
+
+    def test_prune_deletes_unused_lexemes(self):
+        """Test that lexemes left by edits and deletes are pruned"""
+        kept = Word.objects.create(student=self.student, word='voyage',
+                                   translate='trip')
+        renamed = Word.objects.create(student=self.student, word='sea')
+        renamed.word = 'ocean'
+        renamed.save()
+        Word.objects.create(student=self.other, word='ship').delete()
+
+        self.assertEqual(prune_lexemes(), 2)
+        self.assertEqual(
+            set(Lexeme.objects.values_list('word', flat=True)),
+            {'voyage', 'ocean'}
+        )
+        kept.refresh_from_db()
+        self.assertEqual(kept.translate, 'trip')
@@ -0,0 +1,172 @@
+import asyncio
+import re
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, SimpleTestCase, TestCase, \
+    TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.metrics import MetricsRegistry, registry
+from core.models import Student
+
+from trainer import async_views
+
+from user.authentication import token_cache
+
+
+METRICS_URL = reverse('metrics')
+STUDENTS_URL = reverse('trainer:student-list')
+ASYNC_WORDS_URL = reverse('trainer:async-word-list')
+
+
+class MetricsRegistryTests(SimpleTestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that latency buckets count every faster request"""
+        metrics = MetricsRegistry()
+        metrics.observe('GET', 'trainer:word-list', 200, 0.003, 2, 0.001, 10)
+        metrics.observe('GET', 'trainer:word-list', 200, 0.2, 3, 0.002, 20)
+        text = metrics.render()
+
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",'
+                      'route="trainer:word-list",le="0.005"} 1', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",'
+                      'route="trainer:word-list",le="+Inf"} 2', text)
+        self.assertIn('http_response_size_bytes_total{method="GET",'
+                      'route="trainer:word-list"} 30', text)
+        self.assertIn('db_queries_per_request_count{method="GET",'
+                      'route="trainer:word-list"} 2', text)
+
+    def test_collectors_are_rendered(self):
+        """Test that registered collectors add their samples"""
+        metrics = MetricsRegistry()
+        metrics.register_collector(
+            lambda: [('jobs_pending', 'gauge', 'Pending jobs', [({}, 4)])])
+
+        self.assertIn('# TYPE jobs_pending gauge\njobs_pending 4',
+                      metrics.render())
+
+
+@override_settings(METRICS_TOKEN='scrape-secret')
+class MetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.user = get_user_model().objects.create_user(
+            'test@londonappdev.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self):
+        """Read the metrics like the Prometheus scraper"""
+        return self.client.get(METRICS_URL,
+                               HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+    def test_metrics_require_authentication(self):
+        """Test that the metrics need the scrape token or a staff user"""
+        res = APIClient().get(METRICS_URL)
+        self.assertEqual(res.status_code, 401)
+        res = APIClient().get(METRICS_URL, HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(res.status_code, 401)
+
+        client = APIClient()
+        client.force_login(self.user)
+        self.assertEqual(client.get(METRICS_URL).status_code, 401)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(client.get(METRICS_URL).status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_without_token_setting(self):
+        """Test that an unset token does not let bearer requests in"""
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer ')
+
+        self.assertEqual(res.status_code, 401)
+
+    def test_requests_are_recorded_per_route(self):
+        """Test that the metrics endpoint reports served requests"""
+        self.client.get(STUDENTS_URL)
+        self.client.get(STUDENTS_URL)
+
+        res = self.scrape()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        text = res.content.decode()
+        self.assertIn('http_requests_total{method="GET",'
+                      'route="trainer:student-list",status="200"} 2', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",'
+                      'route="trainer:student-list"} 2', text)
+        self.assertNotIn('db_queries_per_request_sum{method="GET",'
+                         'route="trainer:student-list"} 0.0', text)
+        self.assertIn('token_cache_hits', text)
+        self.assertIn('word_set_cache_hit_ratio', text)
+
+    def test_unmatched_paths_share_one_label(self):
+        """Test that unknown urls do not create a route per path"""
+        self.client.get('/no-such-page/')
+        self.client.get('/another-missing-page/')
+
+        text = self.scrape().content.decode()
+
+        self.assertIn('http_requests_total{method="GET",'
+                      'route="unmatched",status="404"} 2', text)
+
+
+def slow_read(request, load, read=async_views._read):
+    """Read the request like the async views after a slow query"""
+    time.sleep(0.3)
+    return read(request, load)
+
+
+@override_settings(TRAINER_ASYNC_DB_THREADS=8)
+class AsyncMetricsMiddlewareTests(TransactionTestCase):
+
+    def setUp(self):
+        registry.reset()
+        token_cache.clear()
+        user = get_user_model().objects.create_user('test@ya.ru', 'pass')
+        self.token = Token.objects.create(user=user)
+        self.student = Student.objects.create(user=user, tg_id='123')
+
+    async def test_async_requests_run_concurrently(self):
+        """Test that the middleware does not serialize ASGI requests"""
+        client = AsyncClient()
+        auth = {'authorization': 'Token ' + self.token.key}
+        with mock.patch.object(async_views, '_read', slow_read):
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.get(ASYNC_WORDS_URL, {'student': self.student.id},
+                           **auth)
+                for _ in range(8)
+            ])
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(res.status_code == 200 for res in responses))
+        self.assertLess(elapsed, 1.2)
+        self.assertIn('http_requests_total{method="GET",'
+                      'route="trainer:async-word-list",status="200"} 8',
+                      registry.render())
+
+    async def test_async_requests_count_queries(self):
+        """Test that queries are counted on the async path"""
+        client = AsyncClient()
+        auth = {'authorization': 'Token ' + self.token.key}
+        await client.get(ASYNC_WORDS_URL, {'student': self.student.id},
+                         **auth)
+        await client.get(STUDENTS_URL, **auth)
+
+        text = registry.render()
+        for route in ('trainer:async-word-list', 'trainer:student-list'):
+            count = re.search(r'db_queries_per_request_sum\{method="GET",'
+                              r'route="%s"\} (\S+)' % route, text)
+            self.assertGreater(float(count.group(1)), 0)
+        self.assertNotIn('db_query_duration_seconds_total{method="GET",'
+                         'route="trainer:student-list"} 0.0\n', text)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.models import Student
+from core.resolvers import STUDENT_KEY, resolve_student_id, student_cache
+
+
+class StudentResolverTests(TestCase):
+
+    def setUp(self):
+        student_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.student = Student.objects.create(user=self.user, tg_id='111')
+
+    def test_resolve_is_cached(self):
+        """Test that a resolved telegram id is served from the cache"""
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_student_id('111'), self.student.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_student_id('111'), self.student.id)
+
+    def test_resolve_unknown(self):
+        """Test that unknown telegram ids resolve to None"""
+        self.assertIsNone(resolve_student_id('999'))
+        self.assertEqual(student_cache.stats()['size'], 0)
+
+    def test_changed_tg_id_is_forgotten(self):
+        """Test that changing the telegram id updates the resolver"""
+        resolve_student_id('111')
+        self.student.tg_id = '222'
+        self.student.save()
+
+        self.assertIsNone(resolve_student_id('111'))
+        self.assertEqual(resolve_student_id('222'), self.student.id)
+
+    def test_deleted_student_is_forgotten(self):
+        """Test that deleting a student updates the resolver"""
+        resolve_student_id('111')
+        self.student.delete()
+
+        self.assertIsNone(resolve_student_id('111'))
+
+    def test_shared_cache_tier(self):
+        """Test that the shared cache is filled and consulted"""
+        resolve_student_id('111')
+        self.assertEqual(cache.get(STUDENT_KEY % '111'), self.student.id)
+        self.assertEqual(student_cache.stats()['size'], 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_student_id('111'), self.student.id)
+
+        self.student.delete()
+        self.assertIsNone(cache.get(STUDENT_KEY % '111'))
+
+    def test_change_in_another_process_is_seen(self):
+        """Test that the shared cache carries changes of other processes"""
+        resolve_student_id('111')
+        # What the signals of another process do after changing tg_id
+        Student.objects.filter(pk=self.student.pk).update(tg_id='222')
+        cache.delete(STUDENT_KEY % '111')
+
+        self.assertIsNone(resolve_student_id('111'))
+        self.assertEqual(resolve_student_id('222'), self.student.id)
+
+    @override_settings(STUDENT_CACHE_BACKEND=None)
+    def test_in_process_tier(self):
+        """Test that the LRU keeps resolutions without a shared cache"""
+        with self.assertNumQueries(1):
+            resolve_student_id('111')
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_student_id('111'), self.student.id)
+
+        self.assertEqual(student_cache.stats()['size'], 1)
+        self.assertIsNone(cache.get(STUDENT_KEY % '111'))
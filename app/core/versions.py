@@ -0,0 +1,19 @@
+from django.db.models import F
+
+from core.models import Student
+
+
+def bump_data_version(*student_ids):
+    """Mark the words and word sets of the students as changed"""
+    student_ids = {pk for pk in student_ids if pk is not None}
+    if student_ids:
+        Student.objects.filter(pk__in=student_ids).update(
+            data_version=F('data_version') + 1
+        )
+
+
+def get_data_version(student_id):
+    """Return the data version of the student or None if missing"""
+    return Student.objects.filter(
+        pk=student_id
+    ).values_list('data_version', flat=True).first()
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from core.metrics import registry
+
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _can_scrape(request):
+    """Return whether the request has the metrics token or a staff user"""
+    auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if settings.METRICS_TOKEN and len(auth) == 2 \
+            and auth[0].lower() == 'bearer' \
+            and constant_time_compare(auth[1], settings.METRICS_TOKEN):
+        return True
+
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics(request):
+    """Expose the collected metrics for a Prometheus scraper"""
+    if not _can_scrape(request):
+        response = HttpResponse('Authentication required.\n', status=401,
+                                content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+        return response
+
+    return HttpResponse(registry.render(),
+                        content_type=PROMETHEUS_CONTENT_TYPE)
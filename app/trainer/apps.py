@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class TrainerConfig(AppConfig):
     name = 'trainer'
+
+    def ready(self):
+        import trainer.jobs  # noqa: F401
+        import trainer.signals  # noqa: F401
+        from core.metrics import cache_collector, registry
+        from trainer.cache import word_set_cache
+
+        registry.register_collector(cache_collector(
+            'word_set_cache', 'Word set detail cache',
+            word_set_cache.stats))
@@ -0,0 +1,184 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.models import Student, Word, WordSet
+from core.resolvers import resolve_student_id
+
+from trainer import serializers
+from trainer.cache import word_set_cache
+from trainer.pagination import IdCursorPagination
+
+from user.authentication import CachedTokenAuthentication
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Return the bounded pool running database work"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TRAINER_ASYNC_DB_THREADS,
+                thread_name_prefix='trainer-db'
+            )
+
+    return _executor
+
+
+def _call_and_release(func, *args):
+    """Run the function and release the connection of the pool thread"""
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args):
+    """Run blocking ORM code without blocking the event loop.
+
+    With TRAINER_ASYNC_DB_THREADS set, calls run concurrently in a pool
+    of that many threads; otherwise they go through sync_to_async and
+    share Django's single thread for synchronous code.
+    """
+    if not settings.TRAINER_ASYNC_DB_THREADS:
+        return await sync_to_async(func)(*args)
+
+    loop = asyncio.get_running_loop()
+    # Carry the context over, e.g. the query counter of the request
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), context.run,
+                                      _call_and_release, func, *args)
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def _error(status, detail):
+    return status, {'detail': detail}
+
+
+def _authenticate(request):
+    """Return the user of the token in the request or None"""
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        return None
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(
+            auth[1].decode()
+        )
+    except (exceptions.AuthenticationFailed, UnicodeError):
+        return None
+
+    return user
+
+
+def _read(request, load):
+    """Authenticate the request and load its data in one pool call"""
+    if _authenticate(request) is None:
+        return _error(401, 'Authentication credentials were not provided.')
+
+    return load()
+
+
+async def _respond(request, load):
+    if request.method != 'GET':
+        return _json({'detail': 'Method "%s" not allowed.' % request.method},
+                     status=405)
+    status, data = await run_db(_read, request, load)
+
+    return _json(data, status=status)
+
+
+def _load_student(tg_id):
+    def load():
+        student = Student.objects.filter(tg_id=tg_id).first()
+        if student is None:
+            return _error(404, 'Not found.')
+
+        return 200, serializers.StudentSerializer(student).data
+
+    return load
+
+
+def _load_words(request):
+    def load():
+        drf_request = Request(request)
+        student = request.GET.get('student')
+        tg_id = request.GET.get('tg_id')
+        queryset = Word.objects.with_text()
+        if student:
+            if not student.isdigit():
+                return _error(400, 'A valid student id is required.')
+            queryset = queryset.filter(student_id=int(student))
+        elif tg_id:
+            queryset = queryset.filter(student_id=resolve_student_id(tg_id))
+
+        paginator = IdCursorPagination()
+        page = paginator.paginate_queryset(queryset, drf_request)
+        data = serializers.WordSerializer(page, many=True).data
+
+        return 200, paginator.get_paginated_response(data).data
+
+    return load
+
+
+def _load_word_set(request, pk):
+    def load():
+        student = request.GET.get('student')
+        tg_id = request.GET.get('tg_id')
+        student_ids = []
+        if student:
+            if not student.isdigit():
+                return _error(400, 'A valid student id is required.')
+            student_ids.append(int(student))
+        if tg_id:
+            student_ids.append(resolve_student_id(tg_id))
+
+        data = word_set_cache.get(pk)
+        if data is None:
+            word_set = WordSet.objects.prefetch_related(
+                Prefetch('words', queryset=Word.objects.with_text())
+            ).filter(pk=pk).first()
+            if word_set is None:
+                return _error(404, 'Not found.')
+            data = serializers.WordSetDetailSerializer(word_set).data
+            word_set_cache.set(pk, data)
+        # The cache is shared by all students, so filter after the lookup
+        if any(data['student'] != student_id for student_id in student_ids):
+            return _error(404, 'Not found.')
+
+        return 200, data
+
+    return load
+
+
+async def student_detail(request, tg_id):
+    """Return the student with the telegram id"""
+    return await _respond(request, _load_student(tg_id))
+
+
+async def word_list(request):
+    """Return a page of words of a student"""
+    return await _respond(request, _load_words(request))
+
+
+async def word_set_detail(request, pk):
+    """Return a word set with its words"""
+    return await _respond(request, _load_word_set(request, pk))
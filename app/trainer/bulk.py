@@ -0,0 +1,70 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from core.lexicon import attach_lexemes
+from core.models import Student, Word
+from core.stats import add_activity, add_to_stats
+from core.versions import bump_data_version
+
+from trainer.dictionary import autofill
+from trainer.serializers import WordImportSerializer
+
+
+def _row_student_ids(rows):
+    """Collect the student ids referenced by the rows"""
+    student_ids = set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            student_ids.add(int(row.get('student')))
+        except (TypeError, ValueError):
+            continue
+
+    return student_ids
+
+
+def import_words(rows, default_student=None):
+    """Validate the rows and insert the valid ones in batches.
+
+    Returns the created words and a list of per-row errors.
+    """
+    if default_student is not None:
+        rows = [
+            dict(row, student=row.get('student') or default_student)
+            if isinstance(row, dict) else row
+            for row in rows
+        ]
+    student_ids = set(
+        Student.objects.filter(
+            id__in=_row_student_ids(rows)
+        ).values_list('id', flat=True)
+    )
+    context = {'student_ids': student_ids}
+
+    words = []
+    errors = []
+    for index, row in enumerate(rows):
+        serializer = WordImportSerializer(data=row, context=context)
+        if not serializer.is_valid():
+            errors.append({'row': index, 'errors': serializer.errors})
+            continue
+        data = dict(serializer.validated_data)
+        data.update(autofill(data))
+        words.append(Word(student_id=data.pop('student'), **data))
+
+    with transaction.atomic():
+        attach_lexemes(words)
+        words = Word.objects.bulk_create(
+            words,
+            batch_size=settings.TRAINER_BULK_BATCH_SIZE
+        )
+        added = Counter(word.student_id for word in words)
+        bump_data_version(*added)
+        for student_id, count in added.items():
+            add_to_stats(student_id, words=count)
+            add_activity(student_id, words_added=count)
+
+    return words, errors
@@ -0,0 +1,71 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class WordSetDetailCache:
+    """Cache of serialized word set details with hit metrics"""
+    key_prefix = 'wordset:detail:'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[settings.WORD_SET_CACHE_BACKEND]
+
+    def _key(self, pk):
+        return '%s%s' % (self.key_prefix, pk)
+
+    def get(self, pk):
+        """Return the cached detail of the word set or None"""
+        data = self.backend.get(self._key(pk))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return data
+
+    def set(self, pk, data):
+        """Store the detail of the word set"""
+        self.backend.set(self._key(pk), data, settings.WORD_SET_CACHE_TTL)
+
+    def invalidate(self, *pks):
+        """Drop the word sets now and again once the transaction commits.
+
+        The second pass drops details cached by readers that still saw
+        the data from before the commit.
+        """
+        keys = [self._key(pk) for pk in set(pks)]
+        if not keys:
+            return
+        with self._lock:
+            self.invalidations += len(keys)
+        self.backend.delete_many(keys)
+        transaction.on_commit(lambda: self.backend.delete_many(keys))
+
+    def reset_stats(self):
+        """Reset the counters"""
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        """Return the hit, miss and invalidation counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+word_set_cache = WordSetDetailCache()
@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import Word, WordSet
+from core.stats import add_activity, add_to_stats
+from core.versions import bump_data_version
+
+
+COPIED_FIELDS = ('word', 'lexeme', 'own_translate', 'own_definition',
+                 'own_example')
+
+SCHEDULE_FIELDS = ('ease', 'interval', 'repetitions', 'due_at',
+                   'reviewed_at', 'updated_at')
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _column(model, name):
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def _copy_words_sql(sets):
+    """Return SQL selecting the words of a set once per row of ``sets``.
+
+    ``sets`` must expose ``student_id``. The copies keep the text and
+    lexeme of the originals and get a fresh schedule from the params.
+    """
+    Membership = WordSet.words.through
+    columns = ', '.join(
+        _column(Word, name)
+        for name in COPIED_FIELDS + ('student', ) + SCHEDULE_FIELDS
+    )
+    copied = ', '.join('w.%s' % _column(Word, name)
+                       for name in COPIED_FIELDS)
+    insert = 'INSERT INTO %s (%s) SELECT %s, s.student_id, %s' % (
+        _table(Word), columns, copied,
+        ', '.join(['%s'] * len(SCHEDULE_FIELDS))
+    )
+
+    return (
+        '%s FROM %s w INNER JOIN %s m ON m.%s = w.%s CROSS JOIN %s s '
+        'WHERE m.%s = %%s' % (
+            insert, _table(Word), _table(Membership),
+            _column(Membership, 'word'), _column(Word, 'id'), sets,
+            _column(Membership, 'wordset'),
+        )
+    )
+
+
+def _schedule_params(now):
+    """Return the schedule of new words as query params"""
+    adapt = connection.ops.adapt_datetimefield_value
+    defaults = {field: Word._meta.get_field(field).get_default()
+                for field in ('ease', 'interval', 'repetitions')}
+
+    return [defaults['ease'], defaults['interval'],
+            defaults['repetitions'], adapt(now), None, adapt(now)]
+
+
+def _clone_returning(word_set, student_ids, name, now):
+    """Copy the set in one statement chaining inserts with RETURNING"""
+    Membership = WordSet.words.through
+    sql = (
+        'WITH sets AS ('
+        'INSERT INTO {sets} ({name}, {student}, {updated}) '
+        'SELECT %s, student_id, %s FROM unnest(%s::integer[]) student_id '
+        'RETURNING {id} AS id, {student} AS student_id'
+        '), words AS ({copy} RETURNING {word_id} AS id, '
+        '{word_student} AS student_id'
+        '), links AS ('
+        'INSERT INTO {links} ({link_set}, {link_word}) '
+        'SELECT s.id, w.id FROM words w INNER JOIN sets s '
+        'ON s.student_id = w.student_id'
+        ') SELECT student_id, id FROM sets'
+    ).format(
+        sets=_table(WordSet),
+        name=_column(WordSet, 'name'),
+        student=_column(WordSet, 'student'),
+        updated=_column(WordSet, 'updated_at'),
+        id=_column(WordSet, 'id'),
+        copy=_copy_words_sql('sets').replace('{', '{{').replace('}', '}}'),
+        word_id=_column(Word, 'id'),
+        word_student=_column(Word, 'student'),
+        links=_table(Membership),
+        link_set=_column(Membership, 'wordset'),
+        link_word=_column(Membership, 'word'),
+    )
+    params = [name, connection.ops.adapt_datetimefield_value(now),
+              student_ids] + _schedule_params(now) + [word_set.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+        return dict(cursor.fetchall())
+
+
+def _clone_after_max_ids(word_set, student_ids, name, now):
+    """Copy the set with one insert per table, finding rows by id.
+
+    The caller holds the write lock, so the rows added after the
+    maximum ids read here are the ones inserted below.
+    """
+    Membership = WordSet.words.through
+    last_set = WordSet.objects.aggregate(last=Max('id'))['last'] or 0
+    last_word = Word.objects.aggregate(last=Max('id'))['last'] or 0
+    WordSet.objects.bulk_create([
+        WordSet(student_id=student_id, name=name, updated_at=now)
+        for student_id in student_ids
+    ], batch_size=settings.TRAINER_BULK_BATCH_SIZE)
+    sets = '(SELECT %s AS student_id FROM %s WHERE %s > %d)' % (
+        _column(WordSet, 'student'), _table(WordSet),
+        _column(WordSet, 'id'), last_set
+    )
+    links = (
+        'INSERT INTO {links} ({link_set}, {link_word}) '
+        'SELECT s.{set_id}, w.{word_id} FROM {words} w '
+        'INNER JOIN {sets} s ON s.{set_student} = w.{word_student} '
+        'WHERE w.{word_id} > %s AND s.{set_id} > %s'
+    ).format(
+        links=_table(Membership),
+        link_set=_column(Membership, 'wordset'),
+        link_word=_column(Membership, 'word'),
+        set_id=_column(WordSet, 'id'),
+        word_id=_column(Word, 'id'),
+        words=_table(Word),
+        sets=_table(WordSet),
+        set_student=_column(WordSet, 'student'),
+        word_student=_column(Word, 'student'),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_copy_words_sql(sets),
+                       _schedule_params(now) + [word_set.pk])
+        cursor.execute(links, [last_word, last_set])
+
+    return dict(
+        WordSet.objects.filter(id__gt=last_set)
+        .values_list('student_id', 'id')
+    )
+
+
+def clone_word_set(word_set, student_ids, name=None):
+    """Copy the word set and its words to every student.
+
+    The copies share the lexemes of the original words and start with a
+    fresh review schedule. Rows are copied by the database with
+    INSERT ... SELECT in one transaction, so no model instances are
+    built for them. Returns the new set ids by student.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    name = name or word_set.name
+    words = word_set.words.count()
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Updating the students first also takes the SQLite write lock
+        bump_data_version(*student_ids)
+        if connection.vendor == 'postgresql':
+            copies = _clone_returning(word_set, student_ids, name, now)
+        else:
+            copies = _clone_after_max_ids(word_set, student_ids, name, now)
+        add_to_stats(*student_ids, words=words, word_sets=1)
+        add_activity(*student_ids, words_added=words)
+
+    return {student_id: copies[student_id] for student_id in student_ids}
@@ -0,0 +1,178 @@
+import logging
+import mmap
+import struct
+import threading
+
+from django.conf import settings
+
+
+MAGIC = b'LTDICT1\n'
+
+HEADER = struct.Struct('<8sQ')
+
+OFFSET = struct.Struct('<Q')
+
+KEY_END = b'\x00'
+
+FIELD_SEPARATOR = b'\x1f'
+
+RECORD_END = b'\x1e'
+
+TEXT_FIELDS = ('translate', 'definition', 'example')
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(word):
+    """Return the lookup key of a headword"""
+    return ' '.join(word.casefold().split()).encode()
+
+
+def _clean(value):
+    """Drop the separator bytes from a value"""
+    for separator in (KEY_END, FIELD_SEPARATOR, RECORD_END):
+        value = value.replace(separator, b'')
+
+    return value
+
+
+def write_dictionary(entries, path):
+    """Write (word, translate, definition, example) entries to a file.
+
+    Records are sorted by key after a table of their offsets, so a
+    lookup is a binary search over the memory-mapped file. The first
+    entry of a repeated headword wins. Returns the number of records.
+    """
+    records = {}
+    for word, *texts in entries:
+        key = _clean(normalize_key(word))
+        if key and key not in records:
+            records[key] = FIELD_SEPARATOR.join(
+                _clean(text.strip().encode()) for text in texts
+            )
+    keys = sorted(records)
+
+    offset = HEADER.size + OFFSET.size * len(keys)
+    offsets = []
+    for key in keys:
+        offsets.append(offset)
+        offset += len(key) + len(records[key]) + 2
+
+    with open(path, 'wb') as dictionary_file:
+        dictionary_file.write(HEADER.pack(MAGIC, len(keys)))
+        for offset in offsets:
+            dictionary_file.write(OFFSET.pack(offset))
+        for key in keys:
+            dictionary_file.write(
+                key + KEY_END + records[key] + RECORD_END
+            )
+
+    return len(keys)
+
+
+class MmapDictionary:
+    """Read-only dictionary file mapped into memory.
+
+    The pages belong to the OS page cache, so every worker process
+    mapping the same file shares them instead of holding its own copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as dictionary_file:
+            self._map = mmap.mmap(dictionary_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, self._count = None, 0
+        if len(self._map) >= HEADER.size:
+            magic, self._count = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError('%s is not a dictionary file' % path)
+
+    def __len__(self):
+        return self._count
+
+    def _key_at(self, index):
+        """Return the key of the record and the offset of its text"""
+        start = OFFSET.unpack_from(
+            self._map,
+            HEADER.size + OFFSET.size * index
+        )[0]
+        end = self._map.find(KEY_END, start)
+
+        return self._map[start:end], end + 1
+
+    def lookup(self, word):
+        """Return the text fields of the headword or None"""
+        key = normalize_key(word)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            found, text_start = self._key_at(middle)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                text_end = self._map.find(RECORD_END, text_start)
+                texts = self._map[text_start:text_end].split(
+                    FIELD_SEPARATOR
+                )
+                return dict(zip(TEXT_FIELDS,
+                                (text.decode() for text in texts)))
+
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+_dictionary = None
+
+# Path that failed to map, so autofill stays off without retrying it
+_unusable_path = None
+
+_lock = threading.Lock()
+
+
+def get_dictionary():
+    """Return the dictionary of TRAINER_DICTIONARY_PATH, mapped once.
+
+    A missing or invalid file is logged once and disables the autofill
+    until the setting changes.
+    """
+    global _dictionary, _unusable_path
+    path = settings.TRAINER_DICTIONARY_PATH
+    if not path or path == _unusable_path:
+        return None
+    dictionary = _dictionary
+    if dictionary is None or dictionary.path != path:
+        with _lock:
+            if path == _unusable_path:
+                return None
+            if _dictionary is None or _dictionary.path != path:
+                try:
+                    _dictionary = MmapDictionary(path)
+                except (OSError, ValueError) as error:
+                    logger.error('Dictionary autofill disabled, cannot map '
+                                 '%s: %s', path, error)
+                    _unusable_path = path
+                    return None
+            dictionary = _dictionary
+
+    return dictionary
+
+
+def autofill(data):
+    """Return the empty text fields of the word data found in the dictionary"""
+    dictionary = get_dictionary()
+    if dictionary is None or not data.get('word'):
+        return {}
+    if all(data.get(field) for field in TEXT_FIELDS):
+        return {}
+    entry = dictionary.lookup(data['word'])
+    if entry is None:
+        return {}
+
+    return {field: entry[field] for field in TEXT_FIELDS
+            if not data.get(field) and entry.get(field)}
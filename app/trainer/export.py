@@ -0,0 +1,87 @@
+import csv
+import json
+
+from django.conf import settings
+from django.utils.html import escape
+
+
+EXPORT_FIELDS = ('id', 'word', 'translate', 'definition', 'example')
+
+ANKI_HEADER = (
+    '#separator:tab\n'
+    '#html:true\n'
+    '#columns:word\ttranslate\tdefinition\texample\n'
+)
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(lines):
+    """Join lines into chunks so the response is not written per row"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= settings.TRAINER_EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)),
+                         ensure_ascii=False) + '\n'
+
+
+def _anki_field(value):
+    """Escape a value for a tab separated Anki note field in HTML"""
+    return escape(value).replace('\t', ' ').replace('\r\n', '<br>') \
+        .replace('\n', '<br>')
+
+
+def _anki_lines(rows):
+    yield ANKI_HEADER
+    for row in rows:
+        yield '\t'.join(_anki_field(value) for value in row[1:]) + '\n'
+
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', _csv_lines),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson',
+               _ndjson_lines),
+    'anki': ('text/tab-separated-values; charset=utf-8', 'txt',
+             _anki_lines),
+}
+
+
+def export_rows(queryset):
+    """Iterate over the export rows of the words in chunks.
+
+    On PostgreSQL the iterator uses a server-side cursor, so only one
+    chunk of rows is held in memory at a time.
+    """
+    queryset = queryset.with_text().order_by('id')
+
+    return queryset.values_list(*EXPORT_FIELDS).iterator(
+        chunk_size=settings.TRAINER_EXPORT_CHUNK_SIZE
+    )
+
+
+def stream_export(queryset, export_format):
+    """Return the content type, file extension and body iterator"""
+    content_type, extension, lines = FORMATS[export_format]
+
+    return content_type, extension, _chunks(lines(export_rows(queryset)))
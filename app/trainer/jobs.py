@@ -0,0 +1,39 @@
+from core.jobs import register
+from core.models import Student, WordSet
+
+from trainer.bulk import import_words
+from trainer.cloning import clone_word_set
+
+
+IMPORT_WORDS = 'import_words'
+
+CLONE_WORD_SET = 'clone_word_set'
+
+
+@register(IMPORT_WORDS)
+def import_words_job(payload):
+    """Import the rows of a bulk request queued in the background"""
+    words, errors = import_words(payload['rows'],
+                                 default_student=payload.get('student'))
+
+    return {
+        'created': len(words),
+        'ids': [word.id for word in words if word.id is not None],
+        'errors': errors,
+    }
+
+
+@register(CLONE_WORD_SET)
+def clone_word_set_job(payload):
+    """Copy a word set to the students of a request queued earlier"""
+    word_set = WordSet.objects.get(pk=payload['word_set'])
+    student_ids = Student.objects.filter(
+        pk__in=payload['students']
+    ).values_list('id', flat=True)
+    copies = clone_word_set(word_set, student_ids, payload.get('name'))
+
+    return {
+        'id': word_set.pk,
+        'word_sets': [{'student': student_id, 'id': pk}
+                      for student_id, pk in copies.items()],
+    }
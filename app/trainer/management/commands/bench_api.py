@@ -0,0 +1,262 @@
+import time
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.middleware import QueryCounter
+from core.models import Student, Word, WordSet
+
+
+# Words sent by the bulk import, set membership and session writes
+WRITE_BATCH = 20
+
+
+def student_params(student):
+    return reverse('trainer:student-list'), {'tg_id': student.tg_id}
+
+
+def word_params(student):
+    return reverse('trainer:word-list'), {'student': student.pk}
+
+
+def search_params(student):
+    return reverse('trainer:word-list'), {'student': student.pk,
+                                          'search': 'harb'}
+
+
+def word_detail_params(student):
+    word_id = Word.objects.filter(student=student) \
+        .values_list('id', flat=True).first()
+    return reverse('trainer:word-detail', args=[word_id]), {}
+
+
+def word_set_params(student):
+    return reverse('trainer:wordset-list'), {'student': student.pk}
+
+
+def word_set_detail_params(student):
+    word_set_id = WordSet.objects.filter(student=student) \
+        .values_list('id', flat=True).first()
+    return reverse('trainer:wordset-detail', args=[word_set_id]), {}
+
+
+def review_params(student):
+    return reverse('trainer:review-list'), {'student': student.pk,
+                                            'limit': 50}
+
+
+def changes_params(student):
+    return reverse('trainer:changes'), {'student': student.pk}
+
+
+def export_params(student):
+    return reverse('trainer:export'), {'student': student.pk,
+                                       'fmt': 'ndjson'}
+
+
+def async_word_params(student):
+    return reverse('trainer:async-word-list'), {'student': student.pk}
+
+
+def _word_ids(student, count=WRITE_BATCH, **filters):
+    words = Word.objects.filter(student=student, **filters)
+
+    return list(words.order_by('id').values_list('id', flat=True)[:count])
+
+
+def _word_set_id(student):
+    return WordSet.objects.filter(student=student) \
+        .order_by('id').values_list('id', flat=True).first()
+
+
+def word_create_params(student):
+    return reverse('trainer:word-list'), {'word': 'bench',
+                                          'student': student.pk}
+
+
+def word_bulk_params(student):
+    return reverse('trainer:word-bulk'), [
+        {'word': 'bench %d' % index, 'student': student.pk}
+        for index in range(WRITE_BATCH)
+    ]
+
+
+def add_words_params(student):
+    """Add the words of the student outside its first word set"""
+    word_set_id = _word_set_id(student)
+    word_ids = list(
+        Word.objects.filter(student=student).exclude(wordset=word_set_id)
+        .order_by('id').values_list('id', flat=True)[:WRITE_BATCH]
+    )
+
+    return reverse('trainer:wordset-add-words', args=[word_set_id]), {
+        'words': word_ids
+    }
+
+
+def remove_words_params(student):
+    """Remove the members of the first word set of the student"""
+    word_set_id = _word_set_id(student)
+
+    return reverse('trainer:wordset-remove-words', args=[word_set_id]), {
+        'words': _word_ids(student, wordset=word_set_id)
+    }
+
+
+def answer_params(student):
+    return reverse('trainer:review-answer'), {
+        'word': _word_ids(student, 1)[0],
+        'quality': 4,
+    }
+
+
+def session_params(student):
+    return reverse('trainer:review-session'), {'answers': [
+        {'word': word_id, 'correct': True}
+        for word_id in _word_ids(student)
+    ]}
+
+
+def clone_params(student):
+    return reverse('trainer:wordset-clone', args=[_word_set_id(student)]), {
+        'students': [student.pk],
+        'name': 'bench copy',
+    }
+
+
+# Reads send their params in the query string, writes as a JSON body
+ENDPOINTS = {
+    'students': ('get', student_params),
+    'words': ('get', word_params),
+    'search': ('get', search_params),
+    'word-detail': ('get', word_detail_params),
+    'wordsets': ('get', word_set_params),
+    'wordset-detail': ('get', word_set_detail_params),
+    'reviews': ('get', review_params),
+    'changes': ('get', changes_params),
+    'export': ('get', export_params),
+    'async-words': ('get', async_word_params),
+    'word-create': ('post', word_create_params),
+    'word-bulk': ('post', word_bulk_params),
+    'add-words': ('post', add_words_params),
+    'remove-words': ('post', remove_words_params),
+    'answer': ('post', answer_params),
+    'session': ('post', session_params),
+    'clone': ('post', clone_params),
+}
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of sorted values"""
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+class Command(BaseCommand):
+    """Django command benchmarking the trainer endpoints
+
+    Queries run by the async views on their worker threads are not counted.
+    Every write request is rolled back, so each one sees the generated data.
+    """
+    help = 'Report latency percentiles and queries per trainer endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='synthetic',
+                            help='Prefix given to generate_data')
+        parser.add_argument('--students', type=int, default=10,
+                            help='Students to spread requests over')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Requests per endpoint')
+        parser.add_argument('--endpoint', action='append',
+                            choices=sorted(ENDPOINTS),
+                            help='Endpoint to run, all by default')
+        parser.add_argument('--max-queries', type=int,
+                            help='Fail when a request runs more queries')
+
+    def _measure(self, client, method, url, params):
+        """Run one request and return its latency and query count"""
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            if method == 'get':
+                response = client.get(url, params)
+            else:
+                response = client.post(url, params, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        latency = time.perf_counter() - start
+
+        if not 200 <= response.status_code < 300:
+            raise CommandError('%s returned %d' % (url,
+                                                   response.status_code))
+
+        return latency, counter.count
+
+    def _request(self, client, method, url, params):
+        """Run one request, rolling back what a write changed"""
+        if method == 'get':
+            return self._measure(client, method, url, params)
+
+        with transaction.atomic():
+            result = self._measure(client, method, url, params)
+            transaction.set_rollback(True)
+
+        return result
+
+    def handle(self, *args, **options):
+        students = list(
+            Student.objects.filter(tg_id__startswith=options['prefix'] + '-')
+            .select_related('user').order_by('id')[:options['students']]
+        )
+        if not students:
+            raise CommandError('No students found, run generate_data first')
+
+        clients = []
+        for student in students:
+            token, _ = Token.objects.get_or_create(user=student.user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+            clients.append((client, student))
+
+        self.stdout.write('%-16s %8s %8s %8s %8s' % (
+            'endpoint', 'p50 ms', 'p95 ms', 'p99 ms', 'queries'))
+        over_budget = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for name in options['endpoint'] or ENDPOINTS:
+                method, endpoint_params = ENDPOINTS[name]
+                targets = [(client, *endpoint_params(student))
+                           for client, student in clients]
+                # Warm up caches and connections once per student
+                for client, url, params in targets:
+                    self._request(client, method, url, params)
+
+                latencies, queries = [], []
+                for i in range(options['requests']):
+                    client, url, params = targets[i % len(targets)]
+                    latency, count = self._request(client, method, url,
+                                                   params)
+                    latencies.append(latency * 1000)
+                    queries.append(count)
+                latencies.sort()
+
+                self.stdout.write('%-16s %8.2f %8.2f %8.2f %8.1f' % (
+                    name,
+                    percentile(latencies, 50),
+                    percentile(latencies, 95),
+                    percentile(latencies, 99),
+                    sum(queries) / len(queries),
+                ))
+                budget = options['max_queries']
+                if budget is not None and max(queries) > budget:
+                    over_budget.append('%s (%d)' % (name, max(queries)))
+
+        if over_budget:
+            raise CommandError('Query budget of %d exceeded by %s' % (
+                options['max_queries'], ', '.join(over_budget)))
@@ -0,0 +1,79 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.lexicon import attach_lexemes
+from core.models import Student, Word
+
+from trainer.fastpath import FastJSONRenderer, FastReadMixin
+from trainer.serializers import WordSerializer
+
+
+class _WordFields(FastReadMixin):
+    queryset = Word.objects.with_text()
+    serializer_class = WordSerializer
+
+
+class Command(BaseCommand):
+    """Django command comparing the serializer and fast read paths"""
+    help = 'Benchmark WordSerializer against the fast read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def _best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = func()
+            timings.append(time.perf_counter() - start)
+
+        return min(timings), body
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                'bench-fast-read@example.com'
+            )
+            student = Student.objects.create(user=user,
+                                             tg_id='bench-fast-read')
+            words = [
+                Word(student=student, word='word %d' % i,
+                     translate='перевод %d' % i,
+                     definition='definition of word %d' % i,
+                     example='an example with word %d' % i)
+                for i in range(rows)
+            ]
+            attach_lexemes(words)
+            Word.objects.bulk_create(words, batch_size=1000)
+            queryset = Word.objects.with_text().filter(
+                student=student
+            ).order_by('id')
+
+            def serializer_path():
+                data = WordSerializer(queryset.all(), many=True).data
+                return JSONRenderer().render(data)
+
+            def fast_path():
+                data = _WordFields.fast_rows(
+                    queryset.values(*_WordFields.get_fast_fields())
+                )
+                return FastJSONRenderer().render(data)
+
+            slow, slow_body = self._best(serializer_path, repeat)
+            fast, fast_body = self._best(fast_path, repeat)
+            transaction.set_rollback(True)
+
+        self.stdout.write('rows: %d, best of %d' % (rows, repeat))
+        self.stdout.write('serializer: %.1f ms' % (slow * 1000))
+        self.stdout.write('fast read:  %.1f ms' % (fast * 1000))
+        self.stdout.write('speedup:    %.1fx' % (slow / fast))
+        if slow_body != fast_body:
+            self.stdout.write(self.style.ERROR('Outputs differ!'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Outputs are identical'))
@@ -0,0 +1,46 @@
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trainer.dictionary import write_dictionary
+
+
+class Command(BaseCommand):
+    """Django command building the autofill dictionary file"""
+    help = ('Build a dictionary file from rows of word, translate, '
+            'definition and example. Workers map the new file after a '
+            'restart.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Tab or comma separated rows')
+        parser.add_argument('output', help='Dictionary file to write')
+        parser.add_argument('--delimiter', default='\t')
+        parser.add_argument('--skip-header', action='store_true')
+
+    def _entries(self, source, delimiter, skip_header):
+        reader = csv.reader(source, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if row and row[0].strip():
+                yield (row + [''] * 4)[:4]
+
+    def handle(self, *args, **options):
+        output = options['output']
+        temporary = output + '.tmp'
+        try:
+            with open(options['source'], newline='',
+                      encoding='utf-8') as source:
+                count = write_dictionary(
+                    self._entries(source, options['delimiter'],
+                                  options['skip_header']),
+                    temporary
+                )
+        except OSError as error:
+            raise CommandError(error)
+        os.replace(temporary, output)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Wrote %d entries to %s' % (count, output)
+        ))
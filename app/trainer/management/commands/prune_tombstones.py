@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from trainer.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """Django command deleting the tombstones past the sync horizon"""
+    help = ('Delete tombstones older than TRAINER_TOMBSTONE_DAYS. Clients '
+            'with older cursors get a full sync.')
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d tombstones older than %d days' % (
+                deleted, settings.TRAINER_TOMBSTONE_DAYS
+            )
+        ))
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.resolvers import resolve_student_id
+from core.versions import get_data_version
+
+
+class StudentETagMixin:
+    """Answer list requests for a student with 304 while data is unchanged.
+
+    The ETag is derived from the data version of the student, so an
+    unchanged list costs one single-row lookup and no word queries.
+    Views must limit the list by both the student and tg_id parameters.
+    """
+
+    def _etag_student_id(self, request):
+        """Return the student the list is limited to, if any"""
+        student = request.query_params.get('student')
+        if student:
+            return int(student) if student.isdigit() else None
+        tg_id = request.query_params.get('tg_id')
+        if tg_id:
+            return resolve_student_id(tg_id)
+
+        return None
+
+    def get_list_etag(self, request):
+        """Return the ETag of the list response or None"""
+        student_id = self._etag_student_id(request)
+        if student_id is None:
+            return None
+        version = get_data_version(student_id)
+        if version is None:
+            return None
+
+        key = '%s|%s|%s|%s' % (request.get_full_path(),
+                               request.accepted_media_type,
+                               student_id, version)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+
+        return 'W/"%s"' % digest
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if etag is not None and (etag in parse_etags(if_none_match)
+                                 or if_none_match.strip() == '*'):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        if etag is not None and response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+
+        return response
@@ -0,0 +1,10 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination ordered by the primary key"""
+    ordering = 'id'
+    page_size = settings.TRAINER_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.TRAINER_MAX_PAGE_SIZE
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def _read_text(stream, parser_context):
+    """Read the whole request body and decode it"""
+    parser_context = parser_context or {}
+    encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+    try:
+        return stream.read().decode(encoding)
+    except UnicodeDecodeError as exc:
+        raise ParseError('Body is not valid %s - %s' % (encoding, exc))
+
+
+class NDJSONParser(BaseParser):
+    """Parses newline delimited JSON into a list of rows"""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        rows = []
+        text = _read_text(stream, parser_context)
+        for number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(
+                    'NDJSON parse error on line %d - %s' % (number, exc)
+                )
+
+        return rows
+
+
+class CSVParser(BaseParser):
+    """Parses CSV with a header row into a list of rows"""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        text = _read_text(stream, parser_context)
+        try:
+            reader = csv.DictReader(io.StringIO(text))
+            return [dict(row) for row in reader]
+        except csv.Error as exc:
+            raise ParseError('CSV parse error - %s' % exc)
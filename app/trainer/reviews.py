@@ -0,0 +1,99 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import ReviewLog, Word
+from core.stats import add_activity, add_to_stats, subtract, word_counters
+
+from trainer.scheduler import answer_quality, schedule_answer
+
+
+SCHEDULE_FIELDS = ('ease', 'interval', 'repetitions', 'due_at',
+                   'reviewed_at')
+
+
+class UnknownWords(Exception):
+    """Raised when answers refer to words that do not exist"""
+
+    def __init__(self, word_ids):
+        super().__init__(word_ids)
+        self.word_ids = word_ids
+
+
+def record_answers(queryset, answers):
+    """Reschedule the answered words and log the answers.
+
+    Every answer is a dict with the word id, correctness and optional
+    response time and quality. The words of the queryset are locked and
+    read in the same transaction that updates them and appends the log,
+    so concurrent answers for a word are applied one after the other.
+    """
+    word_ids = {answer['word'] for answer in answers}
+    now = timezone.now()
+    changed = {}
+    before = {}
+    logs = []
+
+    with transaction.atomic():
+        words = queryset.select_for_update(of=('self', )).order_by(
+            'id'
+        ).in_bulk(word_ids)
+        missing = sorted(word_ids - set(words))
+        if missing:
+            raise UnknownWords(missing)
+
+        for answer in answers:
+            word = words[answer['word']]
+            if word.pk not in before:
+                before[word.pk] = word_counters(word.reviewed_at,
+                                                word.interval)
+            quality = answer.get('quality')
+            if quality is None:
+                quality = answer_quality(answer['correct'],
+                                         answer.get('response_time'))
+            changes = schedule_answer(word.ease, word.interval,
+                                      word.repetitions, quality, now)
+            for field, value in changes.items():
+                setattr(word, field, value)
+            changed[word.pk] = word
+            logs.append(ReviewLog(
+                student_id=word.student_id,
+                word_id=word.pk,
+                quality=quality,
+                correct=answer['correct'],
+                response_time=answer.get('response_time'),
+                reviewed_at=now
+            ))
+
+        Word.objects.bulk_update(
+            changed.values(),
+            SCHEDULE_FIELDS,
+            batch_size=settings.TRAINER_BULK_BATCH_SIZE
+        )
+        ReviewLog.objects.bulk_create(
+            logs,
+            batch_size=settings.TRAINER_BULK_BATCH_SIZE
+        )
+        _count_answers(changed.values(), before, logs)
+
+    return list(changed.values())
+
+
+def _count_answers(words, before, logs):
+    """Add the answers and the rescheduled words to the rollups"""
+    totals = defaultdict(Counter)
+    for word in words:
+        totals[word.student_id].update(subtract(
+            word_counters(word.reviewed_at, word.interval),
+            before[word.pk]
+        ))
+    for log in logs:
+        totals[log.student_id].update(reviews=1,
+                                      correct_reviews=int(log.correct))
+
+    for student_id, deltas in totals.items():
+        add_to_stats(student_id, **deltas)
+        add_activity(student_id, reviews=deltas['reviews'],
+                     correct_reviews=deltas['correct_reviews'])
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+
+MIN_EASE = 1.3
+
+PASSING_QUALITY = 3
+
+FAST_RESPONSE_MS = 3000
+
+SLOW_RESPONSE_MS = 10000
+
+
+def answer_quality(correct, response_time=None):
+    """Grade a correct or wrong answer and its response time from 0 to 5"""
+    if not correct:
+        return 1
+    if response_time is None:
+        return 4
+    if response_time <= FAST_RESPONSE_MS:
+        return 5
+    if response_time <= SLOW_RESPONSE_MS:
+        return 4
+
+    return 3
+
+
+def schedule_answer(ease, interval, repetitions, quality, now):
+    """Apply an SM-2 answer grade from 0 to 5 to a word schedule.
+
+    Returns the fields to store on the word.
+    """
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval = 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = int(round(interval * ease))
+        repetitions += 1
+
+    miss = 5 - quality
+    ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+
+    return {
+        'ease': round(ease, 4),
+        'interval': interval,
+        'repetitions': repetitions,
+        'due_at': now + timedelta(days=interval),
+        'reviewed_at': now,
+    }
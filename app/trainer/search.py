@@ -0,0 +1,137 @@
+from difflib import SequenceMatcher
+
+from django.db import connection
+from django.db.models import BooleanField, Case, F, FloatField, Func, Q, \
+    Subquery, Value, When
+
+from core.models import Lexeme
+
+
+SEARCH_FIELDS = ('word', 'translate', 'definition')
+
+
+def _substring_filter(term):
+    """Return a filter matching the term inside any search field"""
+    query = Q()
+    for field in SEARCH_FIELDS:
+        query |= Q(**{'%s__icontains' % field: term})
+
+    return query
+
+
+class AnyOf(Func):
+    """Match an expression against the ids returned by a subquery.
+
+    ``expression = ANY(ARRAY(subquery))`` runs the subquery once, so an
+    index on the expression still serves it inside an OR, unlike IN.
+    """
+    arg_joiner = ' = ANY(ARRAY'
+    template = '%(expressions)s)'
+    output_field = BooleanField()
+
+
+def _candidate_filter(term, query):
+    """Return a filter each branch of which has its own index.
+
+    Words match on their headword, on their override columns or through
+    the lexemes matching the term; the lexeme subquery uses the indexes
+    on the lexeme table and then the foreign key index of the words.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    lexemes = Lexeme.objects.annotate(
+        document=SearchVector(*SEARCH_FIELDS, config='simple')
+    ).filter(
+        Q(translate__icontains=term)
+        | Q(definition__icontains=term)
+        | Q(document=query)
+    ).values('id')
+    overrides = Q()
+    for field in SEARCH_FIELDS[1:]:
+        overrides |= Q(**{'own_%s__icontains' % field: term})
+
+    return (Q(word__icontains=term) | overrides | Q(own_document=query)
+            | Q(AnyOf(F('lexeme_id'), Subquery(lexemes))))
+
+
+def _search_postgres(queryset, term, limit):
+    """Rank matches with trigram similarity and full-text search.
+
+    Candidates are found through the trigram and document indexes on the
+    words and the lexemes; the text resolved against the lexemes is then
+    checked and ranked on those candidates only.
+    """
+    from django.contrib.postgres.search import SearchQuery, SearchRank, \
+        SearchVector, TrigramSimilarity
+
+    query = SearchQuery(term, config='simple')
+    boost = Case(
+        When(word__iexact=term, then=Value(3.0)),
+        When(word__istartswith=term, then=Value(2.0)),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    own_fields = ['word'] + ['own_%s' % field for field in SEARCH_FIELDS[1:]]
+
+    return queryset.with_text().annotate(
+        own_document=SearchVector(*own_fields, config='simple'),
+        document=SearchVector(*SEARCH_FIELDS, config='simple')
+    ).filter(
+        _candidate_filter(term, query)
+    ).filter(
+        _substring_filter(term) | Q(document=query)
+    ).annotate(
+        rank=boost + TrigramSimilarity('word', term)
+        + SearchRank(F('document'), query)
+    ).order_by('-rank', 'id')[:limit]
+
+
+def _score(word, term, tokens):
+    """Score a candidate word like the PostgreSQL ranking does"""
+    text = word.word.lower()
+    fields = [(getattr(word, field) or '').lower()
+              for field in SEARCH_FIELDS]
+    document = ' '.join(fields).split()
+    substring = any(term in field for field in fields)
+    full_text = all(token in document for token in tokens)
+    if not substring and not full_text:
+        return None
+
+    score = SequenceMatcher(None, text, term).ratio()
+    if text == term:
+        score += 3
+    elif text.startswith(term):
+        score += 2
+    if full_text:
+        score += 0.1 * sum(document.count(token) for token in tokens)
+
+    return score
+
+
+def _search_python(queryset, term, limit):
+    """Rank matches in Python for databases without the indexes"""
+    term = term.lower()
+    tokens = term.split()
+    query = Q()
+    for token in tokens:
+        query &= _substring_filter(token)
+
+    ranked = []
+    for word in queryset.with_text().filter(query):
+        score = _score(word, term, tokens)
+        if score is not None:
+            ranked.append((-score, word.id, word))
+    ranked.sort(key=lambda item: item[:2])
+
+    return [word for _, _, word in ranked[:limit]]
+
+
+def search_words(queryset, term, limit):
+    """Return the words matching the term, best matches first"""
+    term = term.strip()
+    if not term:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, term, limit)
+
+    return _search_python(queryset, term, limit)
@@ -1,6 +1,11 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
-from core.models import Student, Word, WordSet
+from core.models import DailyActivity, Job, Student, StudentStats, \
+    Word, WordSet
+
+from trainer.relations import BulkPrimaryKeyRelatedField
 
 
 class StudentSerializer(serializers.ModelSerializer):
@@ -13,8 +18,58 @@ class StudentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', )
 
 
+class TeacherAddStudentsSerializer(serializers.Serializer):
+    """Serializer for students linked to a teacher"""
+    students = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Student.objects.all(),
+        allow_empty=False
+    )
+
+    def validate_students(self, value):
+        """Check that the teacher is not linked to themselves"""
+        teacher_id = self.context['teacher'].pk
+        if any(student.pk == teacher_id for student in value):
+            raise serializers.ValidationError(
+                'A teacher cannot be their own student.'
+            )
+
+        return value
+
+
+class TeacherStudentsSerializer(serializers.Serializer):
+    """Serializer for students unlinked from a teacher"""
+    students = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False
+    )
+
+
+class DailyActivitySerializer(serializers.ModelSerializer):
+    """Serializer for the activity of a student on one day"""
+
+    class Meta:
+        model = DailyActivity
+        fields = ('day', 'words_added', 'reviews', 'correct_reviews')
+        read_only_fields = fields
+
+
+class StudentStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the counters of a student"""
+
+    class Meta:
+        model = StudentStats
+        fields = ('student', 'words', 'word_sets', 'reviewed_words',
+                  'learned_words', 'reviews', 'correct_reviews',
+                  'updated_at')
+        read_only_fields = fields
+
+
 class WordSerializer(serializers.ModelSerializer):
     """Serializer for word objects"""
+    translate = serializers.CharField(allow_blank=True, required=False)
+    definition = serializers.CharField(allow_blank=True, required=False)
+    example = serializers.CharField(allow_blank=True, required=False)
 
     class Meta:
         model = Word
@@ -23,9 +78,27 @@ class WordSerializer(serializers.ModelSerializer):
         read_only = ('id',)
 
 
+class WordImportSerializer(WordSerializer):
+    """Serializer for a single row of a bulk word import"""
+    student = serializers.IntegerField()
+
+    class Meta:
+        model = Word
+        fields = ('word', 'translate', 'definition', 'example', 'student')
+
+    def validate_student(self, value):
+        """Check the student against the ids resolved for the batch"""
+        if value not in self.context['student_ids']:
+            raise serializers.ValidationError(
+                'Invalid pk "%s" - object does not exist.' % value
+            )
+
+        return value
+
+
 class WordSetSerializer(serializers.ModelSerializer):
     """Serializer a word set"""
-    words = serializers.PrimaryKeyRelatedField(
+    words = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Word.objects.all()
     )
@@ -35,7 +108,146 @@ class WordSetSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'student', 'words')
         read_only = ('id', )
 
+    def validate(self, attrs):
+        """Check that the words belong to the student of the set"""
+        student = attrs.get('student')
+        if student is None and self.instance is not None:
+            student = self.instance.student
+        if 'words' in attrs:
+            foreign = any(word.student_id != student.pk
+                          for word in attrs['words'])
+        elif self.instance is not None \
+                and student.pk != self.instance.student_id:
+            # Moving the set keeps its words, which must move with it
+            foreign = self.instance.words.exclude(student=student).exists()
+        else:
+            foreign = False
+        if foreign:
+            raise serializers.ValidationError(
+                {'words': 'Words must belong to the student of the set.'}
+            )
+
+        return attrs
+
+    def create(self, validated_data):
+        """Create the set and its memberships with one bulk insert"""
+        words = validated_data.pop('words', [])
+        Membership = WordSet.words.through
+        with transaction.atomic():
+            word_set = WordSet.objects.create(**validated_data)
+            Membership.objects.bulk_create([
+                Membership(wordset_id=word_set.pk, word_id=word.pk)
+                for word in words
+            ])
+
+        return word_set
+
+
+class WordSetMembershipSerializer(serializers.Serializer):
+    """Serializer for words added to or removed from a word set"""
+    words = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False
+    )
+
+
+class WordSetAddWordsSerializer(serializers.Serializer):
+    """Serializer for words added to a word set"""
+    words = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Word.objects.all(),
+        allow_empty=False
+    )
+
+    def validate_words(self, value):
+        """Check that the words belong to the student of the set"""
+        student_id = self.context['word_set'].student_id
+        if any(word.student_id != student_id for word in value):
+            raise serializers.ValidationError(
+                'Words must belong to the student of the set.'
+            )
+
+        return value
+
+
+class WordSetCloneSerializer(serializers.Serializer):
+    """Serializer for students receiving a copy of a word set"""
+    students = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Student.objects.all(),
+        allow_empty=False
+    )
+    name = serializers.CharField(max_length=255, required=False)
+
+    def validate_students(self, value):
+        """Check the number of students against the limit"""
+        if len(value) > settings.TRAINER_MAX_CLONE_STUDENTS:
+            raise serializers.ValidationError(
+                'Ensure this field has no more than %d elements.'
+                % settings.TRAINER_MAX_CLONE_STUDENTS
+            )
+
+        return value
+
 
 class WordSetDetailSerializer(WordSetSerializer):
     """Serializer a word set detail"""
     words = WordSerializer(many=True, read_only=True)
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """Serializer for a word with its review schedule"""
+
+    class Meta:
+        model = Word
+        fields = ('id', 'word', 'translate', 'definition', 'example',
+                  'student', 'ease', 'interval', 'repetitions',
+                  'due_at', 'reviewed_at')
+        read_only_fields = fields
+
+
+class AnswerSerializer(serializers.Serializer):
+    """Serializer for a review answer"""
+    word = serializers.IntegerField()
+    quality = serializers.IntegerField(min_value=0, max_value=5)
+
+
+class SessionAnswerSerializer(serializers.Serializer):
+    """Serializer for one answer of a review session"""
+    word = serializers.IntegerField()
+    correct = serializers.BooleanField()
+    response_time = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        allow_null=True
+    )
+    quality = serializers.IntegerField(
+        min_value=0,
+        max_value=5,
+        required=False
+    )
+
+
+class SessionSerializer(serializers.Serializer):
+    """Serializer for all answers of a review session"""
+    answers = SessionAnswerSerializer(many=True, allow_empty=False)
+
+    def validate_answers(self, value):
+        """Limit the size of a session"""
+        if len(value) > settings.TRAINER_MAX_SESSION_ANSWERS:
+            raise serializers.ValidationError(
+                'Ensure this field has no more than %d answers.'
+                % settings.TRAINER_MAX_SESSION_ANSWERS
+            )
+
+        return value
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for the status of a background job"""
+
+    class Meta:
+        model = Job
+        fields = ('id', 'kind', 'status', 'attempts', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
@@ -0,0 +1,53 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete
+from django.dispatch import receiver
+
+from core.models import Word, WordSet
+from core.signals import deleted_with_student
+
+from trainer.cache import word_set_cache
+
+
+Membership = WordSet.words.through
+
+
+def _word_set_ids(word_id):
+    return Membership.objects.filter(
+        word_id=word_id
+    ).values_list('wordset_id', flat=True)
+
+
+@receiver(post_save, sender=WordSet)
+@receiver(post_delete, sender=WordSet)
+def invalidate_word_set(sender, instance, **kwargs):
+    """Drop the cached detail of a changed word set"""
+    word_set_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Word)
+def invalidate_sets_of_saved_word(sender, instance, created, **kwargs):
+    """Drop the cached details of sets containing a changed word"""
+    if not created:
+        word_set_cache.invalidate(*_word_set_ids(instance.pk))
+
+
+@receiver(pre_delete, sender=Word)
+def invalidate_sets_of_deleted_word(sender, instance, **kwargs):
+    """Drop the cached details of sets containing a deleted word"""
+    if deleted_with_student(instance):
+        # The sets of the student are deleted and dropped with it
+        return
+    word_set_cache.invalidate(*_word_set_ids(instance.pk))
+
+
+@receiver(m2m_changed, sender=Membership)
+def invalidate_changed_memberships(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    """Drop the cached details of sets whose words changed"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            word_set_cache.invalidate(instance.pk)
+    elif action == 'pre_clear':
+        word_set_cache.invalidate(*_word_set_ids(instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        word_set_cache.invalidate(*pk_set)
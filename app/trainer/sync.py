@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from core.models import Tombstone, Word, WordSet
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(moment):
+    """Return the opaque sync cursor for the moment"""
+    return str((moment - EPOCH) // MICROSECOND)
+
+
+def decode_cursor(cursor):
+    """Return the moment of the sync cursor, raising ValueError if bad"""
+    return EPOCH + int(cursor) * MICROSECOND
+
+
+def tombstone_horizon():
+    """Return the moment before which tombstones are pruned"""
+    return timezone.now() - timedelta(days=settings.TRAINER_TOMBSTONE_DAYS)
+
+
+def prune_tombstones():
+    """Delete the tombstones older than the horizon and count them"""
+    deleted, _ = Tombstone.objects.filter(
+        deleted_at__lt=tombstone_horizon()
+    ).delete()
+
+    return deleted
+
+
+def collect_changes(student_id, since):
+    """Return the words, word sets and deletions of the student since.
+
+    Rows touched during the overlap window before ``since`` are sent
+    again, so changes committed late by concurrent requests are not lost.
+    """
+    since = since - timedelta(seconds=settings.TRAINER_SYNC_OVERLAP)
+    words = Word.objects.with_text().filter(
+        student_id=student_id,
+        updated_at__gt=since
+    ).order_by('id')
+    word_sets = WordSet.objects.filter(
+        student_id=student_id,
+        updated_at__gt=since
+    ).order_by('id').prefetch_related(
+        Prefetch('words', queryset=Word.objects.only('id'))
+    )
+    deleted = {Tombstone.WORD: [], Tombstone.WORD_SET: []}
+    tombstones = Tombstone.objects.filter(
+        student_id=student_id,
+        deleted_at__gt=since
+    ).order_by('id').values_list('kind', 'object_id')
+    for kind, object_id in tombstones:
+        deleted[kind].append(object_id)
+
+    return words, word_sets, deleted
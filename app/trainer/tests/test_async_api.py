@@ -0,0 +1,139 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, TransactionTestCase, \
+    override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Student, Word, WordSet
+from core.resolvers import student_cache
+
+from trainer.serializers import StudentSerializer, WordSetDetailSerializer
+
+from user.authentication import token_cache
+
+
+WORD_URL = reverse('trainer:async-word-list')
+
+
+def student_url(tg_id):
+    """Return async student detail URL"""
+    return reverse('trainer:async-student-detail', args=[tg_id])
+
+
+def word_set_url(word_set_id):
+    """Return async word set detail URL"""
+    return reverse('trainer:async-wordset-detail', args=[word_set_id])
+
+
+def create_fixtures(test):
+    """Create a user with a token, a student and some words"""
+    student_cache.clear()
+    token_cache.clear()
+    cache.clear()
+    test.user = get_user_model().objects.create_user(
+        'bottest@ya.ru',
+        'test123'
+    )
+    test.token = Token.objects.create(user=test.user)
+    test.student = Student.objects.create(user=test.user, tg_id='123123')
+    test.words = [Word.objects.create(student=test.student, word='w%d' % i)
+                  for i in range(3)]
+
+
+@override_settings(TRAINER_ASYNC_DB_THREADS=0)
+class AsyncReadApiTests(TestCase):
+    """Test the async read endpoints"""
+
+    def setUp(self):
+        create_fixtures(self)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_login_required(self):
+        """Test that a token is required"""
+        res = APIClient().get(student_url(self.student.tg_id))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_only_get_allowed(self):
+        """Test that the async endpoints are read only"""
+        res = self.client.post(WORD_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_student_by_tg_id(self):
+        """Test reading a student by telegram id"""
+        res = self.client.get(student_url(self.student.tg_id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), StudentSerializer(self.student).data)
+
+    def test_unknown_student(self):
+        """Test reading a missing student"""
+        res = self.client.get(student_url('404'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_word_list_matches_sync_endpoint(self):
+        """Test that the async word list has the sync wire format"""
+        params = {'student': self.student.id, 'page_size': 2}
+        res = self.client.get(WORD_URL, params)
+        sync = self.client.get(reverse('trainer:word-list'), params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data['results'], sync.json()['results'])
+        self.assertIsNotNone(data['next'])
+
+    def test_word_set_detail(self):
+        """Test reading a word set with its words"""
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        word_set.words.add(*self.words)
+
+        res = self.client.get(word_set_url(word_set.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), WordSetDetailSerializer(word_set).data)
+
+    def test_word_set_detail_student_filter(self):
+        """Test that the cached word set keeps the student filters"""
+        other = Student.objects.create(user=self.user, tg_id='321')
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        self.client.get(word_set_url(word_set.id))
+
+        res = self.client.get(word_set_url(word_set.id),
+                              {'student': other.id})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(word_set_url(word_set.id),
+                              {'tg_id': other.tg_id})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(word_set_url(word_set.id),
+                              {'student': self.student.id})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@override_settings(TRAINER_ASYNC_DB_THREADS=4)
+class AsyncThreadPoolTests(TransactionTestCase):
+    """Test the async endpoints running queries in the thread pool"""
+
+    def setUp(self):
+        create_fixtures(self)
+
+    async def test_concurrent_requests(self):
+        """Test that many requests can be in flight at once"""
+        client = AsyncClient()
+        auth = {'authorization': 'Token ' + self.token.key}
+        responses = await asyncio.gather(*[
+            client.get(student_url(self.student.tg_id), **auth)
+            for _ in range(10)
+        ])
+
+        self.assertTrue(all(res.status_code == status.HTTP_200_OK
+                            for res in responses))
+        self.assertEqual(responses[0].json()['tg_id'], self.student.tg_id)
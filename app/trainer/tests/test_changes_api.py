@@ -0,0 +1,193 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Student, Tombstone, Word, WordSet
+
+from trainer.sync import decode_cursor, encode_cursor
+
+
+CHANGES_URL = reverse('trainer:changes')
+
+
+@override_settings(TRAINER_SYNC_OVERLAP=0)
+class PrivateChangesApiTests(TestCase):
+    """Test the delta sync API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+
+    def _changes(self, since=None):
+        params = {'student': self.student.id}
+        if since is not None:
+            params['since'] = since
+        res = self.client.get(CHANGES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res.data
+
+    def _age(self, *objects):
+        """Move the objects out of the sync window"""
+        past = timezone.now() - timedelta(minutes=5)
+        for obj in objects:
+            type(obj).objects.filter(pk=obj.pk).update(updated_at=past)
+
+    def test_cursor_round_trip(self):
+        """Test that cursors keep microsecond precision"""
+        moment = timezone.now()
+
+        self.assertEqual(decode_cursor(encode_cursor(moment)), moment)
+
+    def test_initial_sync_returns_everything(self):
+        """Test that a sync without cursor returns all data"""
+        word = Word.objects.create(student=self.student, word='voyage')
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        word_set.words.add(word)
+        other = Student.objects.create(user=self.user, tg_id='222')
+        Word.objects.create(student=other, word='other')
+
+        data = self._changes()
+
+        self.assertEqual([row['id'] for row in data['words']], [word.id])
+        self.assertEqual(data['wordsets'][0]['words'], [word.id])
+        self.assertEqual(data['deleted'], {'words': [], 'wordsets': []})
+
+    def test_only_changes_since_cursor(self):
+        """Test that unchanged rows are not sent again"""
+        old = Word.objects.create(student=self.student, word='old')
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        self._age(old, word_set)
+        cursor = encode_cursor(timezone.now() - timedelta(minutes=1))
+        new = Word.objects.create(student=self.student, word='new')
+
+        data = self._changes(cursor)
+
+        self.assertEqual([row['id'] for row in data['words']], [new.id])
+        self.assertEqual(data['wordsets'], [])
+
+    def test_membership_change_marks_word_set(self):
+        """Test that adding words to a set reports the set"""
+        word = Word.objects.create(student=self.student, word='voyage')
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        self._age(word, word_set)
+        cursor = encode_cursor(timezone.now() - timedelta(minutes=1))
+
+        word_set.words.add(word)
+        data = self._changes(cursor)
+
+        self.assertEqual(data['words'], [])
+        self.assertEqual(data['wordsets'][0]['words'], [word.id])
+
+    def test_deletions_are_reported(self):
+        """Test that deleted words and sets are returned as tombstones"""
+        word = Word.objects.create(student=self.student, word='voyage')
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        word_set.words.add(word)
+        kept_set = WordSet.objects.create(student=self.student, name='kept')
+        kept_set.words.add(word)
+        self._age(word, word_set, kept_set)
+        cursor = encode_cursor(timezone.now() - timedelta(minutes=1))
+        word_id, word_set_id = word.id, word_set.id
+
+        word_set.delete()
+        word.delete()
+        data = self._changes(cursor)
+
+        self.assertEqual(data['deleted'], {'words': [word_id],
+                                           'wordsets': [word_set_id]})
+        self.assertEqual([row['id'] for row in data['wordsets']],
+                         [kept_set.id])
+        self.assertEqual(data['wordsets'][0]['words'], [])
+
+    def test_moved_word_is_deleted_for_old_owner(self):
+        """Test that moving a word reports it deleted to the old owner"""
+        other = Student.objects.create(user=self.user, tg_id='222')
+        word = Word.objects.create(student=self.student, word='voyage')
+        self._age(word)
+        cursor = encode_cursor(timezone.now() - timedelta(minutes=1))
+
+        word.student = other
+        word.save()
+        data = self._changes(cursor)
+
+        self.assertEqual(data['words'], [])
+        self.assertEqual(data['deleted']['words'], [word.id])
+
+        word.student = self.student
+        word.save()
+        data = self._changes(cursor)
+
+        self.assertEqual([row['id'] for row in data['words']], [word.id])
+        self.assertEqual(data['deleted']['words'], [])
+
+    def test_deleting_student_skips_row_bookkeeping(self):
+        """Test that the queries deleting a student do not grow per word"""
+        def delete_student(tg_id, words):
+            student = Student.objects.create(user=self.user, tg_id=tg_id)
+            word_set = WordSet.objects.create(student=student, name='set')
+            word_set.words.set([
+                Word.objects.create(student=student, word='word%d' % index)
+                for index in range(words)
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                student.delete()
+
+            return len(queries)
+
+        self.assertEqual(delete_student('111', 2),
+                         delete_student('222', 40))
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertFalse(Word.objects.exists())
+
+    @override_settings(TRAINER_TOMBSTONE_DAYS=1)
+    def test_cursor_past_horizon_gets_full_sync(self):
+        """Test that a cursor older than the tombstones syncs everything"""
+        word = Word.objects.create(student=self.student, word='voyage')
+        self._age(word)
+        gone = Word.objects.create(student=self.student, word='gone')
+        gone.delete()
+        Tombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=2)
+        )
+        out = StringIO()
+
+        call_command('prune_tombstones', stdout=out)
+        old = self._changes(encode_cursor(
+            timezone.now() - timedelta(days=2)
+        ))
+        recent = self._changes(encode_cursor(
+            timezone.now() - timedelta(minutes=1)
+        ))
+
+        self.assertIn('Deleted 1 tombstones', out.getvalue())
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertTrue(old['full'])
+        self.assertEqual([row['id'] for row in old['words']], [word.id])
+        self.assertFalse(recent['full'])
+        self.assertEqual(recent['words'], [])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        res = self.client.get(CHANGES_URL, {'student': self.student.id,
+                                            'since': 'yesterday'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.models import ReviewLog, Student, Word, WordSet
+from trainer.management.commands.bench_api import remove_words_params
+
+
+class CommandTests(TestCase):
+
+    def test_bench_fast_read(self):
+        """Test the fast read benchmark reports identical output"""
+        out = StringIO()
+        call_command('bench_fast_read', rows=20, repeat=1, stdout=out)
+
+        self.assertIn('speedup', out.getvalue())
+        self.assertIn('Outputs are identical', out.getvalue())
+        self.assertFalse(Word.objects.exists())
+
+    @override_settings(TRAINER_ASYNC_DB_THREADS=0)
+    def test_generate_data_and_bench_api(self):
+        """Test the benchmark runs every endpoint on generated data"""
+        call_command('generate_data', users=2, students=2, words=30,
+                     sets=2, set_size=10, prefix='bench', stdout=StringIO())
+        counts = [model.objects.count() for model in (Word, WordSet,
+                                                      ReviewLog)]
+        out = StringIO()
+        call_command('bench_api', prefix='bench', requests=4, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('p99 ms', output)
+        for name in ('students', 'search', 'wordset-detail', 'export',
+                     'async-words', 'word-bulk', 'remove-words', 'session',
+                     'clone'):
+            self.assertIn(name, output)
+        self.assertEqual([model.objects.count() for model in (
+            Word, WordSet, ReviewLog)], counts)
+
+    def test_bench_api_removes_set_members(self):
+        """Test the remove-words benchmark sends members of the set"""
+        call_command('generate_data', users=1, students=1, words=30,
+                     sets=1, set_size=10, prefix='bench', stdout=StringIO())
+        student = Student.objects.get()
+        word_set = WordSet.objects.get()
+
+        _, params = remove_words_params(student)
+
+        self.assertEqual(len(params['words']), 10)
+        self.assertEqual(set(params['words']),
+                         set(word_set.words.values_list('id', flat=True)))
@@ -0,0 +1,171 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Student, Word
+
+from trainer.dictionary import MmapDictionary, write_dictionary
+
+
+WORDS_URL = reverse('trainer:word-list')
+WORD_BULK_URL = reverse('trainer:word-bulk')
+
+ENTRIES = [
+    ('voyage', 'путешествие', 'a long journey', 'A voyage to the moon'),
+    ('Harbour', 'гавань', 'a sheltered port', ''),
+    ('ember', 'уголёк', '', ''),
+    ('voyage', 'рейс', 'ignored duplicate', ''),
+]
+
+
+def build_dictionary(test, entries=ENTRIES):
+    """Write the entries to a temporary dictionary file"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    path = os.path.join(directory.name, 'words.dict')
+    write_dictionary(entries, path)
+
+    return path
+
+
+class MmapDictionaryTests(SimpleTestCase):
+
+    def test_lookup_finds_every_headword(self):
+        """Test that lookups ignore case and extra spaces"""
+        dictionary = MmapDictionary(build_dictionary(self))
+        self.addCleanup(dictionary.close)
+
+        self.assertEqual(len(dictionary), 3)
+        self.assertEqual(dictionary.lookup('  VOYAGE '), {
+            'translate': 'путешествие',
+            'definition': 'a long journey',
+            'example': 'A voyage to the moon',
+        })
+        self.assertEqual(dictionary.lookup('harbour')['translate'],
+                         'гавань')
+        self.assertEqual(dictionary.lookup('ember')['definition'], '')
+        self.assertIsNone(dictionary.lookup('anchor'))
+        self.assertIsNone(dictionary.lookup('a'))
+
+    def test_other_files_are_rejected(self):
+        """Test that a file without the header is not mapped"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'words.tsv')
+        with open(path, 'wb') as other:
+            other.write(b'voyage\ttrip\n' * 4)
+
+        with self.assertRaises(ValueError):
+            MmapDictionary(path)
+        with open(path, 'wb') as other:
+            other.write(b'voyage')
+        with self.assertRaises(ValueError):
+            MmapDictionary(path)
+
+    def test_build_dictionary_command(self):
+        """Test building a dictionary from a tab separated file"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = os.path.join(directory.name, 'words.tsv')
+        output = os.path.join(directory.name, 'words.dict')
+        with open(source, 'w', encoding='utf-8') as rows:
+            rows.write('word\ttranslate\ndwell\tжить\nmeadow\tлуг\n')
+
+        call_command('build_dictionary', source, output, skip_header=True,
+                     stdout=StringIO())
+
+        dictionary = MmapDictionary(output)
+        self.addCleanup(dictionary.close)
+        self.assertEqual(len(dictionary), 2)
+        self.assertEqual(dictionary.lookup('meadow')['translate'], 'луг')
+
+
+class DictionaryAutofillApiTests(TestCase):
+    """Test filling new words from the dictionary"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+        path = build_dictionary(self)
+        settings_override = override_settings(TRAINER_DICTIONARY_PATH=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_create_fills_empty_fields(self):
+        """Test that only the fields left empty are filled"""
+        payload = {'word': 'voyage', 'definition': 'my own definition',
+                   'student': self.student.id}
+        res = self.client.post(WORDS_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['translate'], 'путешествие')
+        self.assertEqual(res.data['definition'], 'my own definition')
+        self.assertEqual(res.data['example'], 'A voyage to the moon')
+
+    def test_unknown_word_is_kept_empty(self):
+        """Test that words missing from the dictionary are not changed"""
+        res = self.client.post(WORDS_URL, {'word': 'anchor',
+                                           'student': self.student.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['translate'], '')
+
+    def test_bulk_create_fills_empty_fields(self):
+        """Test that bulk imported words are filled as well"""
+        payload = [
+            {'word': 'Harbour', 'student': self.student.id},
+            {'word': 'ember', 'translate': 'угли',
+             'student': self.student.id},
+        ]
+        res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        words = Word.objects.with_text().order_by('id')
+        self.assertEqual(
+            [(word.translate, word.definition) for word in words],
+            [('гавань', 'a sheltered port'), ('угли', '')]
+        )
+
+    @override_settings(TRAINER_DICTIONARY_PATH=None)
+    def test_autofill_is_optional(self):
+        """Test that nothing is filled without a dictionary"""
+        res = self.client.post(WORDS_URL, {'word': 'voyage',
+                                           'student': self.student.id})
+
+        self.assertEqual(res.data['translate'], '')
+
+    def test_unusable_dictionary_disables_autofill(self):
+        """Test that a missing dictionary is logged once and skipped"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'missing.dict')
+
+        with override_settings(TRAINER_DICTIONARY_PATH=path), \
+                self.assertLogs('trainer.dictionary') as logs:
+            responses = [
+                self.client.post(WORDS_URL, {'word': word,
+                                             'student': self.student.id})
+                for word in ('voyage', 'ember')
+            ]
+
+        self.assertEqual([res.status_code for res in responses],
+                         [status.HTTP_201_CREATED] * 2)
+        self.assertEqual(responses[0].data['translate'], '')
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(path, logs.output[0])
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.handlers import StreamingASGIHandler
+from core.models import Student, Word, WordSet
+
+
+EXPORT_URL = reverse('trainer:export')
+
+
+def content(res):
+    """Return the joined body of a streaming response"""
+    return b''.join(res.streaming_content).decode()
+
+
+@override_settings(TRAINER_EXPORT_CHUNK_SIZE=2)
+class PrivateExportApiTests(TestCase):
+    """Test the vocabulary export API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+        self.words = [
+            Word.objects.create(student=self.student, word='voyage',
+                                translate='trip, journey'),
+            Word.objects.create(student=self.student, word='sea',
+                                definition='salt\nwater'),
+            Word.objects.create(student=self.student, word='ship'),
+        ]
+
+    def test_export_csv(self):
+        """Test streaming a student vocabulary as CSV"""
+        res = self.client.get(EXPORT_URL, {'student': self.student.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertIn('student-%d.csv' % self.student.id,
+                      res['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(content(res))))
+        self.assertEqual(rows[0], ['id', 'word', 'translate', 'definition',
+                                   'example'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][2], 'trip, journey')
+        self.assertEqual(rows[2][3], 'salt\nwater')
+
+    def test_export_ndjson_by_tg_id(self):
+        """Test streaming NDJSON for a student found by telegram id"""
+        res = self.client.get(EXPORT_URL, {'tg_id': self.student.tg_id,
+                                           'fmt': 'ndjson'})
+
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual([row['word'] for row in rows],
+                         ['voyage', 'sea', 'ship'])
+
+    def test_export_under_asgi(self):
+        """Test that the ASGI handler streams the whole export"""
+        token = Token.objects.create(user=self.user)
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': EXPORT_URL,
+            'query_string': ('student=%d&fmt=ndjson'
+                             % self.student.id).encode(),
+            'headers': [(b'host', b'testserver'),
+                        (b'authorization', b'Token ' + token.key.encode())],
+        }
+
+        async def export():
+            communicator = ApplicationCommunicator(StreamingASGIHandler(),
+                                                   scope)
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output()
+            body = b''
+            while True:
+                message = await communicator.receive_output()
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    return start, body
+
+        # Like the test client, keep the test transaction's connection
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            start, body = async_to_sync(export)()
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row['word'] for row in rows],
+                         ['voyage', 'sea', 'ship'])
+
+    def test_export_anki_word_set(self):
+        """Test streaming a word set as Anki tab separated notes"""
+        word_set = WordSet.objects.create(student=self.student, name='sea')
+        word_set.words.add(self.words[1])
+
+        res = self.client.get(EXPORT_URL, {'wordset': word_set.id,
+                                           'fmt': 'anki'})
+
+        lines = content(res).splitlines()
+        self.assertEqual(lines[0], '#separator:tab')
+        self.assertEqual(lines[-1], 'sea\t\tsalt<br>water\t')
+        self.assertEqual(len(lines), 4)
+
+    def test_export_anki_escapes_html(self):
+        """Test that markup characters are escaped in Anki fields"""
+        word = Word.objects.create(student=self.student, word='a < b',
+                                   definition='<b>salt</b> & pepper\nsea')
+        word_set = WordSet.objects.create(student=self.student, name='html')
+        word_set.words.add(word)
+
+        res = self.client.get(EXPORT_URL, {'wordset': word_set.id,
+                                           'fmt': 'anki'})
+
+        lines = content(res).splitlines()
+        self.assertEqual(
+            lines[-1],
+            'a &lt; b\t\t&lt;b&gt;salt&lt;/b&gt; &amp; pepper<br>sea\t'
+        )
+
+    def test_export_unknown_format(self):
+        """Test that unknown formats are rejected"""
+        res = self.client.get(EXPORT_URL, {'student': self.student.id,
+                                           'fmt': 'xls'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_unknown_student(self):
+        """Test exporting a missing student"""
+        res = self.client.get(EXPORT_URL, {'tg_id': '404'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Student, Word
+
+from trainer.fastpath import FastJSONRenderer
+
+
+WORD_URL = reverse('trainer:word-list')
+STUDENTS_URL = reverse('trainer:student-list')
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_same_bytes_as_json_renderer(self):
+        """Test that orjson output matches the DRF renderer"""
+        data = {
+            'text': 'путешествие "quoted"\\\n\t\x01 \u2028 \u2029 \U0001f600',
+            'items': [1, None, True, False, 2.5],
+            'nested': {'empty': '', 'list': []},
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data),
+                         JSONRenderer().render(data))
+
+    def test_indented_output(self):
+        """Test that pretty printing still matches"""
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(FastJSONRenderer().render(data, media_type),
+                         JSONRenderer().render(data, media_type))
+
+
+class FastReadApiTests(TestCase):
+    """Test that the fast read mode keeps the wire format"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123',
+            first_name='Роман'
+        )
+        for i in range(5):
+            Word.objects.create(student=self.student, word='слово %d' % i,
+                                translate='word %d' % i,
+                                definition='"quoted"\n')
+
+    def _compare(self, url, params=None):
+        with override_settings(TRAINER_FAST_READ=False):
+            slow = self.client.get(url, params)
+        with override_settings(TRAINER_FAST_READ=True):
+            fast = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast.content, slow.content)
+
+        return fast
+
+    def test_word_list_bytes(self):
+        """Test paginated word lists are identical"""
+        res = self._compare(WORD_URL, {'student': self.student.id,
+                                       'page_size': 2})
+        self.assertIsNotNone(res.json()['next'])
+
+        self._compare(res.json()['next'])
+
+    def test_word_detail_bytes(self):
+        """Test word details are identical"""
+        word = Word.objects.first()
+
+        self._compare(reverse('trainer:word-detail', args=[word.id]))
+        self._compare(reverse('trainer:word-detail', args=[999999]))
+
+    def test_student_bytes(self):
+        """Test student list and detail are identical"""
+        self._compare(STUDENTS_URL)
+        self._compare(reverse('trainer:student-detail',
+                              args=[self.student.id]))
+
+    @override_settings(TRAINER_FAST_READ=True)
+    def test_fast_word_list_queries(self):
+        """Test that the fast path runs a single query per page"""
+        with self.assertNumQueries(2):
+            self.client.get(WORD_URL, {'student': self.student.id})
@@ -0,0 +1,116 @@
+from io import StringIO
+
+import msgpack
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Job, Student, Word, WordSet
+
+
+WORD_BULK_URL = reverse('trainer:word-bulk')
+JOBS_URL = reverse('trainer:job-list')
+
+
+def job_url(job_id):
+    """Return the job status URL"""
+    return reverse('trainer:job-detail', args=[job_id])
+
+
+class PublicJobApiTests(TestCase):
+    """Test unauthenticated job status requests"""
+
+    def test_login_required(self):
+        """Test that login is required for job status"""
+        res = APIClient().get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateJobApiTests(TestCase):
+    """Test background bulk imports and their status"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+
+    def test_background_import_returns_accepted(self):
+        """Test that a background import is queued and run by a worker"""
+        payload = [{'word': 'voyage'}, {'word': ''}]
+        url = '%s?background=1&student=%d' % (WORD_BULK_URL,
+                                              self.student.id)
+        res = self.client.post(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['status'], Job.QUEUED)
+        self.assertTrue(res['Location'].endswith(job_url(res.data['id'])))
+        self.assertFalse(Word.objects.exists())
+
+        call_command('run_workers', once=True, stdout=StringIO())
+
+        res = self.client.get(job_url(res.data['id']))
+        self.assertEqual(res.data['status'], Job.DONE)
+        self.assertEqual(res.data['result']['created'], 1)
+        self.assertEqual(res.data['result']['errors'][0]['row'], 1)
+        self.assertEqual(Word.objects.get().student, self.student)
+
+    def test_background_import_rejects_binary_rows(self):
+        """Test that rows JSON cannot store are refused before queueing"""
+        payload = msgpack.packb([{'word': b'\x00voyage'}],
+                                use_bin_type=True)
+        url = '%s?background=1&student=%d' % (WORD_BULK_URL,
+                                              self.student.id)
+        res = self.client.post(url, payload,
+                               content_type='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_jobs_limited_to_user(self):
+        """Test that users only see their own jobs"""
+        other = get_user_model().objects.create_user('other@ya.ru', 'pass')
+        own = Job.objects.create(kind='import_words', user=self.user)
+        foreign = Job.objects.create(kind='import_words', user=other)
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual([job['id'] for job in res.data['results']],
+                         [own.id])
+        res = self.client.get(job_url(foreign.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_background_clone(self):
+        """Test that a word set is copied to the students by a worker"""
+        word_set = WordSet.objects.create(student=self.student, name='set')
+        word_set.words.add(Word.objects.create(student=self.student,
+                                               word='voyage'))
+        other = Student.objects.create(user=self.user, tg_id='222')
+        url = reverse('trainer:wordset-clone', args=[word_set.id])
+
+        res = self.client.post('%s?background=1' % url,
+                               {'students': [other.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(WordSet.objects.filter(student=other).exists())
+
+        call_command('run_workers', once=True, stdout=StringIO())
+
+        job = Job.objects.get(pk=res.data['id'])
+        self.assertEqual(job.status, Job.DONE)
+        copy = WordSet.objects.get(student=other)
+        self.assertEqual(job.result['word_sets'],
+                         [{'student': other.id, 'id': copy.id}])
+        self.assertEqual(copy.words.get().word, 'voyage')
@@ -0,0 +1,93 @@
+import msgpack
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Student, Word
+
+
+WORD_URL = reverse('trainer:word-list')
+STUDENTS_URL = reverse('trainer:student-list')
+
+MSGPACK = 'application/msgpack'
+
+
+def unpack(res):
+    """Return the decoded MessagePack body"""
+    return msgpack.unpackb(res.content, raw=False)
+
+
+class MessagePackApiTests(TestCase):
+    """Test the MessagePack renderer and parser"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+        for word in ('voyage', 'путешествие'):
+            Word.objects.create(student=self.student, word=word)
+
+    def test_word_list_as_msgpack(self):
+        """Test that the list renders the same data as JSON"""
+        params = {'student': self.student.id}
+        res = self.client.get(WORD_URL, params, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], MSGPACK)
+        self.assertEqual(unpack(res), self.client.get(WORD_URL, params).json())
+
+    def test_word_list_rows_layout(self):
+        """Test the compact columns and rows layout"""
+        res = self.client.get(WORD_URL, {'page_size': 1},
+                              HTTP_ACCEPT=MSGPACK + '; layout=rows')
+
+        data = unpack(res)
+        self.assertEqual(data['columns'], ['id', 'word', 'translate',
+                                           'definition', 'example',
+                                           'student'])
+        self.assertEqual(len(data['rows']), 1)
+        self.assertEqual(data['rows'][0][1], 'voyage')
+        self.assertIsNotNone(data['next'])
+        self.assertNotIn('results', data)
+
+    def test_rows_layout_only_for_opted_in_views(self):
+        """Test that word set lists keep the object layout"""
+        url = reverse('trainer:wordset-list')
+        res = self.client.get(url, HTTP_ACCEPT=MSGPACK + '; layout=rows')
+
+        self.assertIn('results', unpack(res))
+
+    def test_create_student_from_msgpack(self):
+        """Test posting a MessagePack body"""
+        payload = msgpack.packb({'tg_id': '555', 'username': 'roman'})
+        res = self.client.post(STUDENTS_URL, payload, content_type=MSGPACK,
+                               HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(unpack(res)['tg_id'], '555')
+
+    def test_bulk_import_from_msgpack(self):
+        """Test the bulk import accepts MessagePack"""
+        payload = msgpack.packb([{'word': 'sea',
+                                  'student': self.student.id}])
+        res = self.client.post(reverse('trainer:word-bulk'), payload,
+                               content_type=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_msgpack(self):
+        """Test that a malformed body is a bad request"""
+        res = self.client.post(STUDENTS_URL, b'\xc1', content_type=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,215 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ReviewLog, Student, Word
+
+from trainer.scheduler import answer_quality, schedule_answer
+
+
+REVIEW_URL = reverse('trainer:review-list')
+ANSWER_URL = reverse('trainer:review-answer')
+SESSION_URL = reverse('trainer:review-session')
+
+
+def sample_word(student, word='voyage', **params):
+    """Create and return a sample word"""
+    return Word.objects.create(student=student, word=word, **params)
+
+
+class ScheduleAnswerTests(SimpleTestCase):
+
+    def test_successful_answers_grow_interval(self):
+        """Test that intervals follow 1, 6 and then the ease factor"""
+        now = timezone.now()
+        state = {'ease': 2.5, 'interval': 0, 'repetitions': 0}
+        intervals = []
+        for _ in range(3):
+            changes = schedule_answer(quality=5, now=now, **state)
+            state = {key: changes[key]
+                     for key in ('ease', 'interval', 'repetitions')}
+            intervals.append(changes['interval'])
+
+        self.assertEqual(intervals, [1, 6, 16])
+        self.assertEqual(changes['due_at'], now + timedelta(days=16))
+
+    def test_failed_answer_resets_repetitions(self):
+        """Test that a failed answer starts the word over"""
+        changes = schedule_answer(2.5, 20, 4, 1, timezone.now())
+
+        self.assertEqual(changes['repetitions'], 0)
+        self.assertEqual(changes['interval'], 1)
+        self.assertLess(changes['ease'], 2.5)
+
+    def test_ease_has_a_floor(self):
+        """Test that the ease factor never drops below the minimum"""
+        changes = schedule_answer(1.3, 1, 0, 0, timezone.now())
+
+        self.assertEqual(changes['ease'], 1.3)
+
+    def test_answer_quality(self):
+        """Test grading answers by correctness and response time"""
+        self.assertEqual(answer_quality(False, 500), 1)
+        self.assertEqual(answer_quality(True, 500), 5)
+        self.assertEqual(answer_quality(True, 5000), 4)
+        self.assertEqual(answer_quality(True, 60000), 3)
+        self.assertEqual(answer_quality(True), 4)
+
+
+class PublicReviewApiTests(TestCase):
+    """Test unauthenticated review API access"""
+
+    def test_login_required(self):
+        """Test that login is required for reviews"""
+        res = APIClient().get(REVIEW_URL, {'student': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateReviewApiTests(TestCase):
+    """Test the authorized review API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+
+    def test_due_words_ordered_by_due_time(self):
+        """Test listing due words for the student"""
+        now = timezone.now()
+        later = sample_word(self.student, 'later',
+                            due_at=now - timedelta(hours=1))
+        first = sample_word(self.student, 'first',
+                            due_at=now - timedelta(days=2))
+        sample_word(self.student, 'future', due_at=now + timedelta(days=1))
+        other = Student.objects.create(user=self.user, tg_id='222')
+        sample_word(other, 'other', due_at=now - timedelta(days=3))
+
+        res = self.client.get(REVIEW_URL, {'student': self.student.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in res.data],
+                         [first.id, later.id])
+
+    def test_due_words_limit(self):
+        """Test limiting the number of due words"""
+        for i in range(3):
+            sample_word(self.student, 'w%d' % i)
+
+        res = self.client.get(REVIEW_URL, {'student': self.student.id,
+                                           'limit': 2})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_due_words_require_student(self):
+        """Test that the student parameter is required"""
+        res = self.client.get(REVIEW_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_answer_reschedules_word(self):
+        """Test that answering updates the schedule in one write"""
+        word = sample_word(self.student)
+
+        with self.assertNumQueries(8):
+            res = self.client.post(ANSWER_URL,
+                                   {'word': word.id, 'quality': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        word.refresh_from_db()
+        self.assertEqual(word.repetitions, 1)
+        self.assertEqual(word.interval, 1)
+        self.assertGreater(word.due_at, timezone.now())
+        self.assertIsNotNone(word.reviewed_at)
+        self.assertEqual(res.data['interval'], 1)
+        log = ReviewLog.objects.get(word=word)
+        self.assertEqual(log.quality, 5)
+        self.assertTrue(log.correct)
+
+    def test_answer_invalid_quality(self):
+        """Test that the quality must be between 0 and 5"""
+        word = sample_word(self.student)
+
+        res = self.client.post(ANSWER_URL, {'word': word.id, 'quality': 7})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_answer_unknown_word(self):
+        """Test that answering an unknown word is rejected"""
+        res = self.client.post(ANSWER_URL, {'word': 999999, 'quality': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('word', res.data)
+        self.assertEqual(ReviewLog.objects.count(), 0)
+
+    def test_answers_build_on_the_stored_schedule(self):
+        """Test that each answer starts from the schedule in the table"""
+        word = sample_word(self.student)
+
+        for _ in range(3):
+            self.client.post(ANSWER_URL, {'word': word.id, 'quality': 5})
+
+        word.refresh_from_db()
+        self.assertEqual(word.repetitions, 3)
+        self.assertEqual(word.interval, 16)
+
+    def test_session_applies_all_answers(self):
+        """Test submitting a whole session in a fixed number of queries"""
+        words = [sample_word(self.student, 'w%d' % i) for i in range(10)]
+        answers = [
+            {'word': word.id, 'correct': i % 2 == 0, 'response_time': 1000}
+            for i, word in enumerate(words)
+        ]
+
+        with self.assertNumQueries(8):
+            res = self.client.post(SESSION_URL, {'answers': answers},
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['reviewed'], 10)
+        self.assertEqual(ReviewLog.objects.count(), 10)
+        words[0].refresh_from_db()
+        words[1].refresh_from_db()
+        self.assertEqual(words[0].repetitions, 1)
+        self.assertEqual(words[1].repetitions, 0)
+        self.assertEqual(ReviewLog.objects.get(word=words[0]).quality, 5)
+
+    def test_session_repeated_word(self):
+        """Test that repeated answers for a word are applied in order"""
+        word = sample_word(self.student)
+        answers = [{'word': word.id, 'correct': True, 'quality': 5}] * 2
+
+        res = self.client.post(SESSION_URL, {'answers': answers},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        word.refresh_from_db()
+        self.assertEqual(word.repetitions, 2)
+        self.assertEqual(word.interval, 6)
+
+    def test_session_unknown_word(self):
+        """Test that a session with unknown words is rejected"""
+        word = sample_word(self.student)
+        answers = [
+            {'word': word.id, 'correct': True},
+            {'word': 999999, 'correct': False},
+        ]
+
+        res = self.client.post(SESSION_URL, {'answers': answers},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ReviewLog.objects.count(), 0)
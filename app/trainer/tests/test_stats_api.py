@@ -0,0 +1,180 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import DailyActivity, Student, StudentStats, Word, \
+    WordSet
+from core.stats import rebuild_stats
+
+
+REVIEW_SESSION_URL = reverse('trainer:review-session')
+WORD_BULK_URL = reverse('trainer:word-bulk')
+
+
+def stats_url(student_id):
+    """Return the stats URL of the student"""
+    return reverse('trainer:student-stats', args=[student_id])
+
+
+class PublicStatsApiTests(TestCase):
+    """Test unauthenticated stats API access"""
+
+    def test_login_required(self):
+        """Test that login is required for the stats"""
+        res = APIClient().get(stats_url(1))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateStatsApiTests(TestCase):
+    """Test the authorized stats API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+
+    def stats(self, student=None):
+        """Return the stored counters of the student"""
+        return StudentStats.objects.get(student=student or self.student)
+
+    def test_counters_follow_words_and_sets(self):
+        """Test that saving and deleting rows moves the counters"""
+        word = Word.objects.create(student=self.student, word='voyage')
+        Word.objects.create(student=self.student, word='trip',
+                            interval=30, reviewed_at=timezone.now())
+        WordSet.objects.create(student=self.student, name='travel')
+
+        stats = self.stats()
+        self.assertEqual(stats.words, 2)
+        self.assertEqual(stats.word_sets, 1)
+        self.assertEqual(stats.reviewed_words, 1)
+        self.assertEqual(stats.learned_words, 1)
+
+        word.delete()
+        self.assertEqual(self.stats().words, 1)
+
+    def test_moving_word_between_students(self):
+        """Test that a word moved to another student moves its counters"""
+        other = Student.objects.create(user=self.user, tg_id='222')
+        word = Word.objects.create(student=self.student, word='voyage',
+                                   reviewed_at=timezone.now())
+
+        word.student = other
+        word.save()
+
+        self.assertEqual(self.stats().words, 0)
+        self.assertEqual(self.stats().reviewed_words, 0)
+        self.assertEqual(self.stats(other).words, 1)
+        self.assertEqual(self.stats(other).reviewed_words, 1)
+
+    def test_bulk_paths_update_counters(self):
+        """Test that imports and review sessions keep the rollups"""
+        payload = [{'word': 'w%d' % i, 'student': self.student.id}
+                   for i in range(3)]
+        self.client.post(WORD_BULK_URL, payload, format='json')
+        answers = [
+            {'word': word_id, 'correct': i == 0}
+            for i, word_id in enumerate(
+                Word.objects.values_list('id', flat=True)
+            )
+        ]
+        self.client.post(REVIEW_SESSION_URL, {'answers': answers},
+                         format='json')
+
+        stats = self.stats()
+        self.assertEqual(stats.words, 3)
+        self.assertEqual(stats.reviewed_words, 3)
+        self.assertEqual(stats.reviews, 3)
+        self.assertEqual(stats.correct_reviews, 1)
+        activity = DailyActivity.objects.get(student=self.student)
+        self.assertEqual(activity.words_added, 3)
+        self.assertEqual(activity.reviews, 3)
+        self.assertEqual(activity.correct_reviews, 1)
+
+    def test_rollups_match_recount(self):
+        """Test that the counters agree with a full recount"""
+        Word.objects.create(student=self.student, word='voyage')
+        Word.objects.create(student=self.student, word='trip', interval=25)
+        WordSet.objects.create(student=self.student, name='travel')
+        before = StudentStats.objects.filter(
+            student=self.student
+        ).values().get()
+
+        rebuild_stats(self.student.id)
+
+        after = StudentStats.objects.filter(
+            student=self.student
+        ).values().get()
+        before.pop('updated_at')
+        after.pop('updated_at')
+        self.assertEqual(before, after)
+
+    def test_recount_keeps_reviews_of_deleted_words(self):
+        """Test that deleting a reviewed word keeps the review totals"""
+        words = [Word.objects.create(student=self.student, word='w%d' % i)
+                 for i in range(2)]
+        answers = [{'word': word.id, 'correct': True} for word in words]
+        self.client.post(REVIEW_SESSION_URL, {'answers': answers},
+                         format='json')
+        words[0].delete()
+        before = StudentStats.objects.filter(
+            student=self.student
+        ).values().get()
+
+        rebuild_stats(self.student.id)
+
+        after = StudentStats.objects.filter(
+            student=self.student
+        ).values().get()
+        before.pop('updated_at')
+        after.pop('updated_at')
+        self.assertEqual(before, after)
+        self.assertEqual(after['reviews'], 2)
+        self.assertEqual(after['words'], 1)
+
+    def test_retrieve_stats_in_fixed_queries(self):
+        """Test reading the stats without counting the words"""
+        for i in range(20):
+            Word.objects.create(student=self.student, word='w%d' % i)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(stats_url(self.student.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['words'], 20)
+        self.assertEqual(len(res.data['activity']), 1)
+        self.assertEqual(res.data['activity'][0]['words_added'], 20)
+
+    def test_retrieve_stats_rebuilds_missing_row(self):
+        """Test that students without a rollup row get one on read"""
+        Word.objects.create(student=self.student, word='voyage')
+        StudentStats.objects.all().delete()
+
+        res = self.client.get(stats_url(self.student.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['words'], 1)
+
+    def test_retrieve_stats_unknown_student(self):
+        """Test that the stats of an unknown student are not found"""
+        res = self.client.get(stats_url(999999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_stats_invalid_days(self):
+        """Test that the number of days must be an integer"""
+        res = self.client.get(stats_url(self.student.id), {'days': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
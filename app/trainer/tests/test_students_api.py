@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Student
+from core.resolvers import student_cache
 
 from trainer.serializers import StudentSerializer
 
@@ -35,6 +36,7 @@ class PrivateStudentsApiTests(TestCase):
     """Test the authorized user students API"""
 
     def setUp(self):
+        student_cache.clear()
         self.user = get_user_model().objects.create_user(
             'bottest@ya.ru',
             'test123'
@@ -52,7 +54,22 @@ class PrivateStudentsApiTests(TestCase):
         students = Student.objects.all().order_by('tg_id')
         serializer = StudentSerializer(students, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_filter_by_tg_id_changed_elsewhere(self):
+        """Test that a stale resolved tg_id does not select the student"""
+        student = Student.objects.create(user=self.user, tg_id='100')
+        self.client.get(STUDENTS_URL, {'tg_id': '100'})
+        # Bypass the signals like a change made by another process
+        Student.objects.filter(pk=student.pk).update(tg_id='200')
+        Student.objects.bulk_create([Student(user=self.user, tg_id='100')])
+
+        res = self.client.get(STUDENTS_URL, {'tg_id': '100'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertNotEqual(res.data['results'][0]['id'], student.id)
+        self.assertEqual(res.data['results'][0]['tg_id'], '100')
 
     def test_students_no_limited_to_user(self):
         """Test that students are returned not for the authenticated user"""
@@ -66,7 +83,7 @@ class PrivateStudentsApiTests(TestCase):
         res = self.client.get(STUDENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data['results']), 2)
 
     def test_create_student_successful(self):
         """Tset creating a new student"""
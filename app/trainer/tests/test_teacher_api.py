@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Student, Word, WordSet
+
+
+REVIEW_ANSWER_URL = reverse('trainer:review-answer')
+
+
+def dashboard_url(teacher_id):
+    """Return the dashboard URL of the teacher"""
+    return reverse('trainer:student-dashboard', args=[teacher_id])
+
+
+def add_students_url(teacher_id):
+    """Return the URL linking students to the teacher"""
+    return reverse('trainer:student-add-students', args=[teacher_id])
+
+
+def remove_students_url(teacher_id):
+    """Return the URL unlinking students from the teacher"""
+    return reverse('trainer:student-remove-students', args=[teacher_id])
+
+
+class PrivateTeacherApiTests(TestCase):
+    """Test the authorized teacher API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.teacher = Student.objects.create(
+            user=self.user,
+            tg_id='teacher',
+            is_teacher=True
+        )
+
+    def sample_student(self, tg_id, words=0, sets=0):
+        """Create a student with words and word sets"""
+        student = Student.objects.create(user=self.user, tg_id=tg_id)
+        for i in range(words):
+            Word.objects.create(student=student, word='w%d' % i)
+        for i in range(sets):
+            WordSet.objects.create(student=student, name='s%d' % i)
+
+        return student
+
+    def test_add_and_remove_students(self):
+        """Test linking students to a teacher and unlinking them"""
+        first = self.sample_student('1')
+        second = self.sample_student('2')
+
+        res = self.client.post(add_students_url(self.teacher.id),
+                               {'students': [first.id, second.id]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(self.teacher.students.all()), {first, second})
+        self.assertEqual(list(first.teachers.all()), [self.teacher])
+
+        res = self.client.post(remove_students_url(self.teacher.id),
+                               {'students': [first.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.teacher.students.all()), [second])
+
+    def test_add_unknown_or_self_student(self):
+        """Test that only other existing students can be linked"""
+        res = self.client.post(add_students_url(self.teacher.id),
+                               {'students': [999999]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(add_students_url(self.teacher.id),
+                               {'students': [self.teacher.id]},
+                               format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.teacher.students.exists())
+
+    def test_students_require_teacher(self):
+        """Test that only teachers have students and a dashboard"""
+        student = self.sample_student('1')
+
+        res = self.client.post(add_students_url(student.id),
+                               {'students': [self.teacher.id]},
+                               format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(dashboard_url(student.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dashboard_counts(self):
+        """Test the counters and activity of every linked student"""
+        first = self.sample_student('1', words=3, sets=2)
+        second = self.sample_student('2', words=1)
+        self.sample_student('3', words=5)
+        self.teacher.students.add(first, second)
+        word = first.word_set.first()
+        self.client.post(REVIEW_ANSWER_URL, {'word': word.id, 'quality': 5})
+
+        res = self.client.get(dashboard_url(self.teacher.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = {row['id']: row for row in res.data['students']}
+        self.assertEqual(set(rows), {first.id, second.id})
+        self.assertEqual(rows[first.id]['words'], 3)
+        self.assertEqual(rows[first.id]['word_sets'], 2)
+        self.assertEqual(rows[first.id]['words_added'], 3)
+        self.assertEqual(rows[first.id]['reviews'], 1)
+        self.assertEqual(rows[first.id]['correct_reviews'], 1)
+        self.assertIsNotNone(rows[first.id]['last_reviewed_at'])
+        self.assertEqual(rows[second.id]['words'], 1)
+        self.assertEqual(rows[second.id]['reviews'], 0)
+        self.assertIsNone(rows[second.id]['last_reviewed_at'])
+
+    def test_dashboard_queries_do_not_grow_with_class(self):
+        """Test that the dashboard runs a fixed number of queries"""
+        for i in range(20):
+            self.teacher.students.add(self.sample_student(str(i), words=2))
+
+        with self.assertNumQueries(2):
+            res = self.client.get(dashboard_url(self.teacher.id),
+                                  {'days': 7})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['days'], 7)
+        self.assertEqual(len(res.data['students']), 20)
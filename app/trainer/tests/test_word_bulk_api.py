@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Student, Word
+
+
+WORD_BULK_URL = reverse('trainer:word-bulk')
+
+
+class PublicWordBulkApiTests(TestCase):
+    """Test unauthenticated bulk word import"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_login_required(self):
+        """Test that login is required for the bulk import"""
+        res = self.client.post(WORD_BULK_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateWordBulkApiTests(TestCase):
+    """Test the authorized bulk word import"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.client.force_authenticate(self.user)
+        self.student = Student.objects.create(
+            user=self.user,
+            tg_id='123123123'
+        )
+
+    def test_bulk_create_json(self):
+        """Test importing words from a JSON array"""
+        payload = [
+            {'word': 'voyage', 'translate': 'trip',
+             'student': self.student.id},
+            {'word': 'travel', 'student': self.student.id},
+        ]
+        res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['errors'], [])
+        words = Word.objects.with_text().filter(student=self.student)
+        self.assertEqual(words.count(), 2)
+        self.assertTrue(words.filter(word='voyage', translate='trip'))
+
+    def test_bulk_create_ndjson(self):
+        """Test importing words from newline delimited JSON"""
+        body = (
+            '{"word": "voyage", "student": %d}\n'
+            '\n'
+            '{"word": "trip", "student": %d}\n'
+        ) % (self.student.id, self.student.id)
+        res = self.client.post(WORD_BULK_URL, body,
+                               content_type='application/x-ndjson')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Word.objects.count(), 2)
+
+    def test_bulk_create_csv_with_default_student(self):
+        """Test importing CSV rows with the student from the query"""
+        body = 'word,translate\nvoyage,trip\n"one, two",pair\n'
+        url = '%s?student=%d' % (WORD_BULK_URL, self.student.id)
+        res = self.client.post(url, body, content_type='text/csv')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 2)
+        self.assertTrue(Word.objects.with_text().filter(
+            student=self.student,
+            word='one, two',
+            translate='pair'
+        ).exists())
+
+    def test_bulk_create_reports_row_errors(self):
+        """Test that invalid rows are reported and valid ones kept"""
+        payload = [
+            {'word': 'voyage', 'student': self.student.id},
+            {'word': '', 'student': self.student.id},
+            {'word': 'trip', 'student': 999999},
+            'not a row',
+        ]
+        res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 1)
+        rows = [error['row'] for error in res.data['errors']]
+        self.assertEqual(rows, [1, 2, 3])
+        self.assertIn('word', res.data['errors'][0]['errors'])
+        self.assertIn('student', res.data['errors'][1]['errors'])
+        self.assertEqual(Word.objects.count(), 1)
+
+    def test_bulk_create_all_invalid(self):
+        """Test that a batch without valid rows fails"""
+        payload = [{'word': 'voyage'}]
+        res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Word.objects.count(), 0)
+
+    def test_bulk_create_requires_list(self):
+        """Test that the body must be a list of rows"""
+        payload = {'word': 'voyage', 'student': self.student.id}
+        res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_queries_do_not_grow_with_rows(self):
+        """Test that the import runs a fixed number of queries"""
+        payload = [
+            {'word': 'word%d' % i, 'student': self.student.id}
+            for i in range(50)
+        ]
+        with self.assertNumQueries(11):
+            res = self.client.post(WORD_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Word.objects.count(), 50)
@@ -1,12 +1,17 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import WordSet, Student, Word
+from core.models import WordSet, Student, StudentStats, Word
+from core.resolvers import student_cache
 
+from trainer.cache import word_set_cache
 from trainer.serializers import WordSetSerializer, WordSetDetailSerializer
 
 
@@ -51,6 +56,9 @@ class PrivateWordSetApiTest(TestCase):
     """Test authenticated word set API"""
 
     def setUp(self):
+        student_cache.clear()
+        cache.clear()
+        word_set_cache.reset_stats()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             'bottest@ya.ru',
@@ -72,7 +80,7 @@ class PrivateWordSetApiTest(TestCase):
         word_sets = WordSet.objects.all().order_by('id')
         serializer = WordSetSerializer(word_sets, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_word_sets_limited_to_student(self):
         """Test retrieving word sets for student"""
@@ -88,8 +96,32 @@ class PrivateWordSetApiTest(TestCase):
         word_sets = WordSet.objects.filter(student=self.student)
         serializer = WordSetSerializer(word_sets, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_word_sets_limited_to_tg_id(self):
+        """Test retrieving word sets by the student telegram id"""
+        student2 = Student.objects.create(
+            user=self.user,
+            tg_id='11111'
+        )
+        sample_word_set(student=student2)
+        word_set = sample_word_set(student=self.student)
+
+        res = self.client.get(WORD_SET_URL, {'tg_id': self.student.tg_id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['id'], word_set.id)
+
+    def test_word_sets_unknown_tg_id(self):
+        """Test that an unknown telegram id returns no word sets"""
+        sample_word_set(student=self.student)
+
+        res = self.client.get(WORD_SET_URL, {'tg_id': '404'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
 
     def test_view_word_set_detail(self):
         """Test viewing a word set detail"""
@@ -146,6 +178,33 @@ class PrivateWordSetApiTest(TestCase):
         self.assertEqual(len(words), 1)
         self.assertEqual(new_word, words[0])
 
+    def test_invalid_student_filter(self):
+        """Test that a non-numeric student filter is a bad request"""
+        word_set = sample_word_set(student=self.student)
+
+        res = self.client.get(WORD_SET_URL, {'student': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(detail_url(word_set.id), {'student': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_move_word_set_keeps_word_ownership(self):
+        """Test that a set cannot move away from the owner of its words"""
+        other = Student.objects.create(user=self.user, tg_id='321')
+        word_set = sample_word_set(student=self.student)
+        word_set.words.add(sample_word(student=self.student))
+
+        res = self.client.patch(detail_url(word_set.id),
+                                {'student': other.id}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        word_set.refresh_from_db()
+        self.assertEqual(word_set.student, self.student)
+
+        word_set.words.clear()
+        res = self.client.patch(detail_url(word_set.id),
+                                {'student': other.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_full_update_word_set(self):
         """Test updating a word set with put"""
         word_set = sample_word_set(student=self.student)
@@ -162,3 +221,300 @@ class PrivateWordSetApiTest(TestCase):
         self.assertEqual(word_set.name, payload['name'])
         words = word_set.words.all()
         self.assertEqual(len(words), 0)
+
+    def test_word_set_list_query_count(self):
+        """Test listing word sets does not query words per set"""
+        for i in range(5):
+            word_set = sample_word_set(student=self.student)
+            word_set.words.add(
+                sample_word(student=self.student, word='a%d' % i),
+                sample_word(student=self.student, word='b%d' % i)
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(WORD_SET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 5)
+        self.assertEqual(len(res.data['results'][0]['words']), 2)
+
+    def test_word_set_detail_query_count(self):
+        """Test viewing a word set detail loads words in one query"""
+        word_set = sample_word_set(student=self.student)
+        for i in range(5):
+            word_set.words.add(sample_word(student=self.student,
+                                           word='w%d' % i))
+
+        with self.assertNumQueries(2):
+            res = self.client.get(detail_url(word_set.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['words']), 5)
+
+    def test_create_word_set_validates_words_in_one_query(self):
+        """Test creating a large word set runs a fixed number of queries"""
+        words = [sample_word(student=self.student, word='w%d' % i)
+                 for i in range(50)]
+        payload = {
+            'name': 'big',
+            'student': self.student.id,
+            'words': [word.id for word in words]
+        }
+
+        with self.assertNumQueries(9):
+            res = self.client.post(WORD_SET_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        word_set = WordSet.objects.get(id=res.data['id'])
+        self.assertEqual(word_set.words.count(), 50)
+
+    def test_create_word_set_unknown_word(self):
+        """Test that unknown word ids are rejected"""
+        word = sample_word(student=self.student)
+        payload = {
+            'name': 'voyage',
+            'student': self.student.id,
+            'words': [word.id, 999999]
+        }
+        res = self.client.post(WORD_SET_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('999999', str(res.data['words']))
+        self.assertFalse(WordSet.objects.exists())
+
+    def test_create_word_set_other_student_word(self):
+        """Test that words of another student are rejected"""
+        student2 = Student.objects.create(user=self.user, tg_id='11111')
+        payload = {
+            'name': 'voyage',
+            'student': self.student.id,
+            'words': [sample_word(student=student2).id]
+        }
+        res = self.client.post(WORD_SET_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WordSet.objects.exists())
+
+    def test_add_words_to_word_set(self):
+        """Test adding only new words to a word set"""
+        word_set = sample_word_set(student=self.student)
+        old = sample_word(student=self.student, word='old')
+        word_set.words.add(old)
+        new = sample_word(student=self.student, word='new')
+
+        url = reverse('trainer:wordset-add-words', args=[word_set.id])
+        res = self.client.post(url, {'words': [old.id, new.id]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(word_set.words.all()), {old, new})
+
+    def test_add_words_cost_does_not_depend_on_set_size(self):
+        """Test that adding to a large set only touches the delta"""
+        word_set = sample_word_set(student=self.student)
+        word_set.words.add(*[sample_word(student=self.student, word='w%d' % i)
+                             for i in range(100)])
+        new = [sample_word(student=self.student, word='n%d' % i)
+               for i in range(3)]
+
+        url = reverse('trainer:wordset-add-words', args=[word_set.id])
+        with self.assertNumQueries(6):
+            res = self.client.post(url, {'words': [w.id for w in new]},
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(word_set.words.count(), 103)
+
+    def test_add_words_of_other_student(self):
+        """Test that words of another student cannot be added"""
+        word_set = sample_word_set(student=self.student)
+        student2 = Student.objects.create(user=self.user, tg_id='11111')
+
+        url = reverse('trainer:wordset-add-words', args=[word_set.id])
+        res = self.client.post(
+            url,
+            {'words': [sample_word(student=student2).id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(word_set.words.count(), 0)
+
+    def test_remove_words_from_word_set(self):
+        """Test removing words with a single delete"""
+        word_set = sample_word_set(student=self.student)
+        words = [sample_word(student=self.student, word='w%d' % i)
+                 for i in range(100)]
+        word_set.words.add(*words)
+
+        url = reverse('trainer:wordset-remove-words', args=[word_set.id])
+        with self.assertNumQueries(4):
+            res = self.client.post(
+                url,
+                {'words': [words[0].id, words[1].id, 999999]},
+                format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(word_set.words.count(), 98)
+        self.assertFalse(word_set.words.filter(id=words[0].id).exists())
+
+    def test_word_set_list_not_modified(self):
+        """Test that an unchanged list is answered with 304"""
+        word_set = sample_word_set(student=self.student)
+        params = {'tg_id': self.student.tg_id}
+        res = self.client.get(WORD_SET_URL, params)
+        etag = res['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(WORD_SET_URL, params,
+                                  HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+        word_set.words.add(sample_word(student=self.student))
+        res = self.client.get(WORD_SET_URL, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_word_set_detail_is_cached(self):
+        """Test that a repeated detail request skips the database"""
+        word_set = sample_word_set(student=self.student)
+        word_set.words.add(sample_word(student=self.student))
+        url = detail_url(word_set.id)
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.data, first.data)
+        stats = word_set_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_word_set_detail_invalidated_by_word_change(self):
+        """Test that changing a word of the set refreshes the detail"""
+        word_set = sample_word_set(student=self.student)
+        word = sample_word(student=self.student)
+        word_set.words.add(word)
+        url = detail_url(word_set.id)
+        self.client.get(url)
+
+        word.translate = 'trip'
+        word.save()
+        res = self.client.get(url)
+
+        self.assertEqual(res.data['words'][0]['translate'], 'trip')
+
+    def test_word_set_detail_invalidated_by_membership(self):
+        """Test that adding and deleting words refreshes the detail"""
+        word_set = sample_word_set(student=self.student)
+        url = detail_url(word_set.id)
+        self.client.get(url)
+
+        word = sample_word(student=self.student)
+        word.wordset_set.add(word_set)
+        res = self.client.get(url)
+        self.assertEqual(len(res.data['words']), 1)
+
+        word.delete()
+        res = self.client.get(url)
+        self.assertEqual(res.data['words'], [])
+        self.assertGreaterEqual(word_set_cache.stats()['invalidations'], 2)
+
+    def test_deleted_word_set_detail_not_served(self):
+        """Test that a deleted word set is not served from cache"""
+        word_set = sample_word_set(student=self.student)
+        url = detail_url(word_set.id)
+        self.client.get(url)
+
+        word_set.delete()
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_word_set_detail_keeps_student_filter(self):
+        """Test that a cached detail is not served to other students"""
+        other = Student.objects.create(user=self.user, tg_id='321')
+        word_set = sample_word_set(student=self.student)
+        url = detail_url(word_set.id)
+        self.client.get(url)
+
+        res = self.client.get(url, {'student': other.id})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(url, {'tg_id': other.tg_id})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(url, {'tg_id': self.student.tg_id})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], word_set.id)
+
+    def test_clone_word_set_to_students(self):
+        """Test copying a set and its words to many students"""
+        word = Word.objects.create(student=self.student, word='voyage',
+                                   translate='trip', interval=30)
+        word_set = sample_word_set(student=self.student, name='travel')
+        word_set.words.add(word, sample_word(self.student, 'harbour'))
+        students = [Student.objects.create(user=self.user, tg_id=str(i))
+                    for i in range(3)]
+
+        url = reverse('trainer:wordset-clone', args=[word_set.id])
+        res = self.client.post(url, {'students': [s.id for s in students]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['word_sets']), 3)
+        for row, student in zip(res.data['word_sets'], students):
+            copy = WordSet.objects.get(pk=row['id'])
+            self.assertEqual(copy.student, student)
+            self.assertEqual(copy.name, 'travel')
+            words = copy.words.with_text().order_by('id')
+            self.assertEqual([w.word for w in words], ['voyage', 'harbour'])
+            self.assertEqual(words[0].translate, 'trip')
+            self.assertEqual(words[0].lexeme_id, word.lexeme_id)
+            self.assertEqual(words[0].interval, 0)
+            self.assertEqual(set(w.student_id for w in words), {student.id})
+            stats = StudentStats.objects.get(student=student)
+            self.assertEqual(stats.words, 2)
+            self.assertEqual(stats.word_sets, 1)
+
+    def test_clone_queries_do_not_grow_with_students(self):
+        """Test that cloning runs a fixed number of queries"""
+        word_set = sample_word_set(student=self.student)
+        word_set.words.add(*[sample_word(self.student, 'w%d' % i)
+                             for i in range(5)])
+        students = [Student.objects.create(user=self.user, tg_id=str(i))
+                    for i in range(30)]
+        url = reverse('trainer:wordset-clone', args=[word_set.id])
+
+        counts = []
+        for name, size in (('few', 2), ('copy', 30)):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    url,
+                    {'students': [s.id for s in students[:size]],
+                     'name': name},
+                    format='json'
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(WordSet.objects.filter(name='copy').count(), 30)
+        self.assertEqual(Word.objects.count(), 165)
+        copy = WordSet.objects.filter(name='copy').last()
+        self.assertEqual(copy.words.count(), 5)
+        self.assertTrue(all(word.student_id == copy.student_id
+                            for word in copy.words.all()))
+
+    def test_clone_to_unknown_student(self):
+        """Test that every student must exist"""
+        word_set = sample_word_set(student=self.student)
+        url = reverse('trainer:wordset-clone', args=[word_set.id])
+
+        res = self.client.post(url, {'students': [999999]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(WordSet.objects.count(), 1)
@@ -62,7 +62,7 @@ class PrivateWordsApiTests(TestCase):
         words = Word.objects.all().order_by('-word')
         serializer = WordSerializer(words, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_words_limited_to_student(self):
         """Test that only words for the student are returned"""
@@ -78,8 +78,8 @@ class PrivateWordsApiTests(TestCase):
                               {'student': self.student.id})
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['word'], word.word)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['word'], word.word)
 
     def test_create_word_successful(self):
         """Test create a new word"""
@@ -105,7 +105,7 @@ class PrivateWordsApiTests(TestCase):
         self.client.post(WORD_URL, payload)
 
         res = self.client.get(WORD_URL)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data['results']), 2)
 
     def test_create_word_invalid(self):
         """Test creating invalid word fails"""
@@ -130,3 +130,143 @@ class PrivateWordsApiTests(TestCase):
 
         serializer = WordSerializer(word)
         self.assertEqual(res.data, serializer.data)
+
+    def test_word_list_cursor_pagination(self):
+        """Test that the word list is paginated by a stable cursor"""
+        words = [sample_word(student=self.student, word='w%d' % i)
+                 for i in range(3)]
+
+        res = self.client.get(WORD_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in res.data['results']]
+        self.assertEqual(ids, [words[0].id, words[1].id])
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+
+        ids = [row['id'] for row in res.data['results']]
+        self.assertEqual(ids, [words[2].id])
+        self.assertIsNone(res.data['next'])
+
+    def test_search_words_ranked(self):
+        """Test searching words ranks exact and prefix matches first"""
+        Word.objects.create(student=self.student, word='overtrip')
+        prefix = Word.objects.create(student=self.student, word='tripod')
+        exact = Word.objects.create(student=self.student, word='trip')
+        translated = Word.objects.create(student=self.student,
+                                         word='voyage',
+                                         translate='long trip')
+        Word.objects.create(student=self.student, word='unrelated')
+
+        res = self.client.get(WORD_URL, {'search': 'Trip',
+                                         'student': self.student.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in res.data['results']]
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(ids[:2], [exact.id, prefix.id])
+        self.assertIn(translated.id, ids)
+
+    def test_search_words_full_text(self):
+        """Test that all terms may match across fields"""
+        word = Word.objects.create(student=self.student, word='voyage',
+                                   definition='a long journey by sea')
+        Word.objects.create(student=self.student, word='journey')
+
+        res = self.client.get(WORD_URL, {'search': 'voyage sea'})
+
+        ids = [row['id'] for row in res.data['results']]
+        self.assertEqual(ids, [word.id])
+
+    def test_search_words_limited_to_student(self):
+        """Test that searching respects the student filter"""
+        student2 = Student.objects.create(user=self.user, tg_id='11111')
+        Word.objects.create(student=student2, word='trip')
+
+        res = self.client.get(WORD_URL, {'search': 'trip',
+                                         'student': self.student.id})
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_invalid_student_filter(self):
+        """Test that a non-numeric student filter is a bad request"""
+        for params in ({'student': 'abc'},
+                       {'student': 'abc', 'search': 'trip'}):
+            res = self.client.get(WORD_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_word_list_not_modified(self):
+        """Test that the word list ETag follows the student writes"""
+        word = sample_word(student=self.student)
+        params = {'student': self.student.id}
+        etag = self.client.get(WORD_URL, params)['ETag']
+
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        word.translate = 'trip'
+        word.save()
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        word.delete()
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_word_list_by_tg_id_not_modified(self):
+        """Test that other students' writes keep the tg_id list cached"""
+        student2 = Student.objects.create(user=self.user, tg_id='11111')
+        word = sample_word(student=self.student)
+        params = {'tg_id': self.student.tg_id}
+        res = self.client.get(WORD_URL, params)
+        etag = res['ETag']
+
+        self.assertEqual([row['id'] for row in res.data['results']],
+                         [word.id])
+
+        sample_word(student=student2, word='trip')
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        res = self.client.get(WORD_URL, params)
+        self.assertEqual([row['id'] for row in res.data['results']],
+                         [word.id])
+
+        sample_word(student=self.student, word='trip')
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_word_list_unknown_tg_id(self):
+        """Test that an unknown telegram id lists no words"""
+        sample_word(student=self.student)
+
+        res = self.client.get(WORD_URL, {'tg_id': '404'})
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_word_list_etag_per_page(self):
+        """Test that different query parameters get different ETags"""
+        sample_word(student=self.student)
+
+        res1 = self.client.get(WORD_URL, {'student': self.student.id})
+        res2 = self.client.get(WORD_URL, {'student': self.student.id,
+                                          'page_size': 1})
+
+        self.assertNotEqual(res1['ETag'], res2['ETag'])
+
+    def test_moving_word_changes_both_students(self):
+        """Test that moving a word invalidates the previous student"""
+        student2 = Student.objects.create(user=self.user, tg_id='11111')
+        word = sample_word(student=self.student)
+        params = {'student': self.student.id}
+        etag = self.client.get(WORD_URL, params)['ETag']
+
+        word.student = student2
+        word.save()
+        res = self.client.get(WORD_URL, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
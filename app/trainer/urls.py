@@ -1,16 +1,25 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from trainer import views
+from trainer import async_views, views
 
 
 router = DefaultRouter()
 router.register('students', views.StudentViewSet)
 router.register('words', views.WordViewSet)
 router.register('wordsets', views.WordSetViewSet)
+router.register('reviews', views.ReviewViewSet, basename='review')
+router.register('jobs', views.JobViewSet)
 
 app_name = 'trainer'
 
 urlpatterns = [
+    path('changes/', views.ChangesView.as_view(), name='changes'),
+    path('export/', views.ExportView.as_view(), name='export'),
+    path('async/students/<str:tg_id>/', async_views.student_detail,
+         name='async-student-detail'),
+    path('async/words/', async_views.word_list, name='async-word-list'),
+    path('async/wordsets/<int:pk>/', async_views.word_set_detail,
+         name='async-wordset-detail'),
     path('', include(router.urls))
 ]
@@ -1,18 +1,87 @@
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.jobs import enqueue
+from core.models import DailyActivity, Job, Student, StudentStats, \
+    Tombstone, Word, WordSet
+from core.parsers import MessagePackParser
+from core.resolvers import resolve_student_id
+from core.stats import class_overview, rebuild_stats
+
+from trainer import jobs, serializers
+from trainer.bulk import import_words
+from trainer.cache import word_set_cache
+from trainer.cloning import clone_word_set
+from trainer.dictionary import autofill
+from trainer.export import FORMATS, stream_export
+from trainer.fastpath import FastReadMixin
+from trainer.mixins import StudentETagMixin
+from trainer.pagination import IdCursorPagination
+from trainer.parsers import CSVParser, NDJSONParser
+from trainer.reviews import UnknownWords, record_answers
+from trainer.scheduler import PASSING_QUALITY
+from trainer.search import search_words
+from trainer.sync import EPOCH, collect_changes, decode_cursor, \
+    encode_cursor, tombstone_horizon
+
+from user.authentication import CachedTokenAuthentication
+
+
+def parse_student_id(student):
+    """Return the student parameter as an id or raise a 400"""
+    try:
+        return int(student)
+    except ValueError:
+        raise ValidationError({'student': 'A valid id is required.'})
 
-from core.models import Student, Word, WordSet
 
-from trainer import serializers
+def student_id_param(request):
+    """Return the student id from the student or tg_id parameter"""
+    student = request.query_params.get('student')
+    tg_id = request.query_params.get('tg_id')
+    if student:
+        return parse_student_id(student)
+    if tg_id:
+        return resolve_student_id(tg_id)
 
+    raise ValidationError({'student': 'This parameter is required.'})
 
-class StudentViewSet(viewsets.ModelViewSet):
+
+def queued_response(request, job):
+    """Return 202 pointing at the status of a queued job"""
+    url = request.build_absolute_uri(
+        reverse('trainer:job-detail', args=[job.pk])
+    )
+
+    return Response(
+        serializers.JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': url}
+    )
+
+
+class StudentViewSet(FastReadMixin, viewsets.ModelViewSet):
     """Manage students in the database"""
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
     queryset = Student.objects.all()
     serializer_class = serializers.StudentSerializer
+    pagination_class = IdCursorPagination
+    msgpack_rows = True
 
     def get_queryset(self):
         """Return the students by telegram id"""
@@ -27,13 +96,107 @@ class StudentViewSet(viewsets.ModelViewSet):
         """Create a new student"""
         serializer.save(user=self.request.user)
 
+    def get_serializer_class(self):
+        """Return appropriate serializer class"""
+        if self.action == 'add_students':
+            return serializers.TeacherAddStudentsSerializer
+        if self.action == 'remove_students':
+            return serializers.TeacherStudentsSerializer
+
+        return self.serializer_class
+
+    def _teacher(self):
+        """Return the requested student, who must be a teacher"""
+        teacher = self.get_object()
+        if not teacher.is_teacher:
+            raise ValidationError({'student': 'Student is not a teacher.'})
+
+        return teacher
+
+    def _days(self):
+        """Return the requested number of activity days within the bounds"""
+        days = self.request.query_params.get('days')
+        if not days:
+            return settings.TRAINER_STATS_DAYS
+        try:
+            days = int(days)
+        except ValueError:
+            raise ValidationError({'days': 'A valid integer is required.'})
+
+        return max(1, min(days, settings.TRAINER_MAX_STATS_DAYS))
+
+    @action(methods=['GET'], detail=True)
+    def stats(self, request, pk=None):
+        """Return the counters and recent activity of the student"""
+        days = self._days()
+        stats = None
+        if pk.isdigit():
+            stats = StudentStats.objects.filter(student_id=pk).first()
+        if stats is None:
+            student = self.get_object()
+            rebuild_stats(student.pk)
+            stats = StudentStats.objects.get(student_id=student.pk)
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+        activity = DailyActivity.objects.filter(
+            student_id=stats.student_id,
+            day__gte=since
+        ).order_by('day')
+        data = serializers.StudentStatsSerializer(stats).data
+        data['activity'] = serializers.DailyActivitySerializer(
+            activity, many=True
+        ).data
+
+        return Response(data)
+
+    @action(methods=['POST'], detail=True, url_path='add-students')
+    def add_students(self, request, pk=None):
+        """Link the given students to the teacher"""
+        teacher = self._teacher()
+        context = self.get_serializer_context()
+        context['teacher'] = teacher
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        students = serializer.validated_data['students']
+        teacher.students.add(*students)
+
+        return Response({'id': teacher.pk,
+                         'students': [student.pk for student in students]})
+
+    @action(methods=['POST'], detail=True, url_path='remove-students')
+    def remove_students(self, request, pk=None):
+        """Unlink the given students from the teacher"""
+        teacher = self._teacher()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        student_ids = serializer.validated_data['students']
+        teacher.students.remove(*student_ids)
 
-class WordViewSet(viewsets.ModelViewSet):
+        return Response({'id': teacher.pk, 'students': student_ids})
+
+    @action(methods=['GET'], detail=True)
+    def dashboard(self, request, pk=None):
+        """Return the counters and recent activity of the whole class"""
+        teacher = self._teacher()
+        days = self._days()
+        since = timezone.localdate() - timedelta(days=days - 1)
+
+        return Response({
+            'id': teacher.pk,
+            'days': days,
+            'students': list(class_overview(teacher.pk, since)),
+        })
+
+
+class WordViewSet(StudentETagMixin, FastReadMixin,
+                  viewsets.ModelViewSet):
     """Manage words in the database"""
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
-    queryset = Word.objects.all()
+    queryset = Word.objects.with_text()
     serializer_class = serializers.WordSerializer
+    pagination_class = IdCursorPagination
+    msgpack_rows = True
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers"""
@@ -42,43 +205,390 @@ class WordViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Return the words for the student"""
         student = self.request.query_params.get('student')
+        tg_id = self.request.query_params.get('tg_id')
         queryset = self.queryset
         if student:
-            student_id = int(student)
+            student_id = parse_student_id(student)
+            queryset = queryset.filter(student__id=student_id)
+        if tg_id:
+            student_id = resolve_student_id(tg_id)
+            if student_id is None:
+                return queryset.none()
             queryset = queryset.filter(student__id=student_id)
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Return the words, ranked by relevance when searching"""
+        term = request.query_params.get('search')
+        if term is None:
+            return super().list(request, *args, **kwargs)
+
+        words = search_words(
+            self.filter_queryset(self.get_queryset()),
+            term,
+            settings.TRAINER_SEARCH_LIMIT
+        )
+        serializer = self.get_serializer(words, many=True)
+
+        return Response({
+            'next': None,
+            'previous': None,
+            'results': serializer.data,
+        })
+
     def perform_create(self, serializer):
-        """Create a new word"""
-        serializer.save()
+        """Create a new word, filling empty text from the dictionary"""
+        serializer.save(**autofill(serializer.validated_data))
+
+    @action(methods=['POST'], detail=False, url_path='bulk',
+            parser_classes=(JSONParser, NDJSONParser, CSVParser,
+                            MessagePackParser))
+    def bulk(self, request):
+        """Create many words from a JSON array, NDJSON or CSV body"""
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'detail': 'Expected a non-empty list of words'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.TRAINER_BULK_MAX_ROWS:
+            return Response(
+                {'detail': 'Too many rows, the limit is %d'
+                           % settings.TRAINER_BULK_MAX_ROWS},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.query_params.get('background') in ('1', 'true'):
+            payload = {'rows': rows,
+                       'student': request.query_params.get('student')}
+            try:
+                json.dumps(payload, allow_nan=False)
+            except (TypeError, ValueError):
+                return Response(
+                    {'detail': 'Rows of a background import must be '
+                               'JSON serializable'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return queued_response(request, enqueue(
+                jobs.IMPORT_WORDS, payload, user=request.user
+            ))
 
+        words, errors = import_words(
+            rows,
+            default_student=request.query_params.get('student')
+        )
+        data = {
+            'created': len(words),
+            'ids': [word.id for word in words if word.id is not None],
+            'errors': errors,
+        }
+        if not words:
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-class WordSetViewSet(viewsets.ModelViewSet):
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class WordSetViewSet(StudentETagMixin, viewsets.ModelViewSet):
     """Manage word sets in the database"""
     serializer_class = serializers.WordSetSerializer
     queryset = WordSet.objects.all()
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         """Retrieve the word sets for the student"""
         student = self.request.query_params.get('student')
         tg_id = self.request.query_params.get('tg_id')
         queryset = self.queryset.order_by('id')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('words', queryset=Word.objects.with_text())
+            )
+        elif self.action == 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('words', queryset=Word.objects.only('id'))
+            )
         if student:
-            student_id = int(student)
+            student_id = parse_student_id(student)
             queryset = queryset.filter(student__id=student_id)
         if tg_id:
-            print(tg_id)
-            student_id = Student.objects.get(tg_id=tg_id)
+            student_id = resolve_student_id(tg_id)
+            if student_id is None:
+                return queryset.none()
             queryset = queryset.filter(student__id=student_id)
 
         return queryset
 
+    def _cached_detail(self, pk):
+        """Return the cached detail if it passes the student filters"""
+        student = self.request.query_params.get('student')
+        tg_id = self.request.query_params.get('tg_id')
+        if not pk.isdigit() or (student and not student.isdigit()):
+            return None
+        data = word_set_cache.get(pk)
+        if data is None:
+            return None
+        if student and data['student'] != int(student):
+            return None
+        if tg_id and data['student'] != resolve_student_id(tg_id):
+            return None
+
+        return data
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the word set detail, served from cache when possible.
+
+        A hit outside the student filters falls through to the filtered
+        queryset, which answers 404.
+        """
+        data = self._cached_detail(kwargs[self.lookup_field])
+        if data is not None:
+            return Response(data)
+
+        response = super().retrieve(request, *args, **kwargs)
+        word_set_cache.set(response.data['id'], response.data)
+
+        return response
+
     def get_serializer_class(self):
         """Return appropriate serializer class"""
         if self.action == 'retrieve':
             return serializers.WordSetDetailSerializer
+        if self.action == 'add_words':
+            return serializers.WordSetAddWordsSerializer
+        if self.action == 'remove_words':
+            return serializers.WordSetMembershipSerializer
+        if self.action == 'clone':
+            return serializers.WordSetCloneSerializer
 
         return self.serializer_class
+
+    @action(methods=['POST'], detail=True, url_path='add-words')
+    def add_words(self, request, pk=None):
+        """Add only the given words to the word set"""
+        word_set = self.get_object()
+        context = self.get_serializer_context()
+        context['word_set'] = word_set
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        words = serializer.validated_data['words']
+        word_set.words.add(*words)
+
+        return Response({'id': word_set.pk,
+                         'words': [word.pk for word in words]})
+
+    @action(methods=['POST'], detail=True, url_path='remove-words')
+    def remove_words(self, request, pk=None):
+        """Remove only the given words from the word set"""
+        word_set = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        word_ids = serializer.validated_data['words']
+        word_set.words.remove(*word_ids)
+
+        return Response({'id': word_set.pk, 'words': word_ids})
+
+    @action(methods=['POST'], detail=True)
+    def clone(self, request, pk=None):
+        """Copy the word set and its words to the given students"""
+        word_set = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        student_ids = [student.pk for student
+                       in serializer.validated_data['students']]
+        name = serializer.validated_data.get('name')
+
+        if request.query_params.get('background') in ('1', 'true'):
+            return queued_response(request, enqueue(
+                jobs.CLONE_WORD_SET,
+                {'word_set': word_set.pk, 'students': student_ids,
+                 'name': name},
+                user=request.user
+            ))
+
+        copies = clone_word_set(word_set, student_ids, name)
+
+        return Response(
+            {'id': word_set.pk,
+             'word_sets': [{'student': student_id, 'id': copy_id}
+                           for student_id, copy_id in copies.items()]},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ReviewViewSet(viewsets.GenericViewSet):
+    """Schedule word reviews with spaced repetition"""
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+    queryset = Word.objects.with_text()
+    serializer_class = serializers.ReviewSerializer
+
+    def _limit(self):
+        """Return the requested number of words within the bounds"""
+        limit = self.request.query_params.get('limit')
+        if not limit:
+            return settings.TRAINER_REVIEW_LIMIT
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+
+        return max(1, min(limit, settings.TRAINER_MAX_REVIEW_LIMIT))
+
+    def get_serializer_class(self):
+        """Return appropriate serializer class"""
+        if self.action == 'answer':
+            return serializers.AnswerSerializer
+        if self.action == 'session':
+            return serializers.SessionSerializer
+
+        return self.serializer_class
+
+    def list(self, request):
+        """Return the words due for review ordered by due time"""
+        student_id = student_id_param(request)
+        limit = self._limit()
+        if student_id is None:
+            return Response([])
+
+        queryset = self.get_queryset().filter(
+            student_id=student_id,
+            due_at__lte=timezone.now()
+        ).order_by('due_at')[:limit]
+        serializer = self.get_serializer(queryset, many=True)
+
+        return Response(serializer.data)
+
+    @action(methods=['POST'], detail=False)
+    def answer(self, request):
+        """Record an answer and reschedule the word"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        word_id = serializer.validated_data['word']
+        quality = serializer.validated_data['quality']
+
+        try:
+            words = record_answers(self.get_queryset(), [{
+                'word': word_id,
+                'correct': quality >= PASSING_QUALITY,
+                'quality': quality,
+            }])
+        except UnknownWords:
+            raise ValidationError({'word': [
+                'Invalid pk "%s" - object does not exist.' % word_id
+            ]})
+
+        return Response(serializers.ReviewSerializer(words[0]).data)
+
+    @action(methods=['POST'], detail=False)
+    def session(self, request):
+        """Record all answers of a review session in one transaction"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        answers = serializer.validated_data['answers']
+
+        try:
+            words = record_answers(self.get_queryset(), answers)
+        except UnknownWords as error:
+            return Response(
+                {'answers': ['Invalid words %s' % error.word_ids]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        data = serializers.ReviewSerializer(words, many=True).data
+
+        return Response({'reviewed': len(answers), 'words': data})
+
+
+class ChangesView(APIView):
+    """Return what changed for a student since a sync cursor"""
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        """Return changed words and word sets with deleted ids.
+
+        ``full`` tells the client the rows are all of its data, so rows
+        it holds that are missing from them were deleted.
+        """
+        student_id = student_id_param(request)
+        try:
+            since = decode_cursor(request.query_params.get('since', 0))
+        except (TypeError, ValueError, OverflowError):
+            raise ValidationError({'since': 'A valid cursor is required.'})
+
+        cursor = encode_cursor(timezone.now())
+        # Deletions before the horizon are pruned, so send everything
+        full = since < tombstone_horizon()
+        if full:
+            since = EPOCH
+        if student_id is None:
+            words, word_sets = [], []
+            deleted = {Tombstone.WORD: [], Tombstone.WORD_SET: []}
+        else:
+            words, word_sets, deleted = collect_changes(student_id, since)
+
+        return Response({
+            'cursor': cursor,
+            'full': full,
+            'words': serializers.WordSerializer(words, many=True).data,
+            'wordsets': serializers.WordSetSerializer(
+                word_sets,
+                many=True
+            ).data,
+            'deleted': {
+                'words': deleted[Tombstone.WORD],
+                'wordsets': deleted[Tombstone.WORD_SET],
+            },
+        })
+
+
+class ExportView(APIView):
+    """Stream the vocabulary of a student or a word set"""
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        """Stream the words as CSV, NDJSON or Anki TSV"""
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in FORMATS:
+            raise ValidationError(
+                {'fmt': 'Choose one of %s.' % ', '.join(sorted(FORMATS))}
+            )
+
+        word_set_id = request.query_params.get('wordset')
+        if word_set_id:
+            if not word_set_id.isdigit():
+                raise ValidationError({'wordset': 'A valid id is required.'})
+            word_set = get_object_or_404(WordSet, pk=word_set_id)
+            queryset = word_set.words.all()
+            name = 'wordset-%s' % word_set.pk
+        else:
+            student = get_object_or_404(Student,
+                                        pk=student_id_param(request))
+            queryset = Word.objects.filter(student=student)
+            name = 'student-%s' % student.pk
+
+        content_type, extension, body = stream_export(queryset,
+                                                      export_format)
+        response = StreamingHttpResponse(body, content_type=content_type)
+        response['Content-Disposition'] = (
+            'attachment; filename="%s.%s"' % (name, extension)
+        )
+
+        return response
+
+
+class JobViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                 viewsets.GenericViewSet):
+    """Report the status of background jobs of the user"""
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+    queryset = Job.objects.all()
+    serializer_class = serializers.JobSerializer
+    pagination_class = IdCursorPagination
+
+    def get_queryset(self):
+        """Return the jobs queued by the user"""
+        return self.queryset.filter(user=self.request.user)
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class UserConfig(AppConfig):
     name = 'user'
+
+    def ready(self):
+        import user.signals  # noqa: F401
+        from core.metrics import cache_collector, registry
+        from user.authentication import token_cache
+
+        registry.register_collector(cache_collector(
+            'token_cache', 'Token authentication cache', token_cache.stats))
@@ -0,0 +1,73 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import LRUCache
+
+
+REVOCATION_KEY = 'token:revoked:%s'
+
+token_cache = LRUCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+def _revocations():
+    """Return the Django cache sharing revocations between processes"""
+    if not settings.TOKEN_REVOCATION_BACKEND:
+        return None
+
+    return caches[settings.TOKEN_REVOCATION_BACKEND]
+
+
+def _revocation_marker(user_id):
+    shared = _revocations()
+    if shared is None:
+        return None
+
+    return shared.get(REVOCATION_KEY % user_id)
+
+
+def revoke_user_tokens(user_id):
+    """Make every process look up the tokens of the user again.
+
+    The marker is replaced now and once more after the commit, so
+    processes that looked the user up before the commit drop it too.
+    """
+    shared = _revocations()
+    if shared is None:
+        return
+
+    def replace_marker():
+        shared.set(REVOCATION_KEY % user_id, uuid.uuid4().hex, None)
+
+    replace_marker()
+    transaction.on_commit(replace_marker)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching token to user lookups in process.
+
+    Each hit compares the revocation marker of the user in the shared
+    cache with the one seen when the token was looked up, so tokens
+    revoked by another process stop working at once.
+    """
+
+    def authenticate_credentials(self, key):
+        """Return the cached user and token or look them up"""
+        cached = token_cache.get(key)
+        if cached is not None:
+            credentials, marker = cached
+            if marker == _revocation_marker(credentials[0].pk):
+                return credentials
+
+        token_cache.delete(key)
+        credentials = super().authenticate_credentials(key)
+        token_cache.set(key, (credentials,
+                              _revocation_marker(credentials[0].pk)))
+
+        return credentials
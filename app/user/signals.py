@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import revoke_user_tokens, token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Drop a deleted token from the authentication cache"""
+    token_cache.delete(instance.key)
+    revoke_user_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_saved_user(sender, instance, **kwargs):
+    """Drop cached tokens of a changed user, e.g. a deactivated one"""
+    token_cache.delete_where(lambda cached: (
+        cached[0][0].pk == instance.pk
+    ))
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import revoke_user_tokens, token_cache
+
+
+STUDENTS_URL = reverse('trainer:student-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication"""
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'bottest@ya.ru',
+            'test123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_token_lookup_is_cached(self):
+        """Test that the second request skips the token query"""
+        with self.assertNumQueries(2):
+            res = self.client.get(STUDENTS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(STUDENTS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        stats = token_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed lookups are not stored"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token wrong')
+        res = self.client.get(STUDENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    def test_deleted_token_is_invalidated(self):
+        """Test that deleting a token revokes cached access"""
+        self.client.get(STUDENTS_URL)
+        self.token.delete()
+
+        res = self.client.get(STUDENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_invalidated(self):
+        """Test that deactivating a user revokes cached access"""
+        self.client.get(STUDENTS_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(STUDENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_from_another_process(self):
+        """Test that a shared revocation marker drops cached tokens"""
+        self.client.get(STUDENTS_URL)
+        # Change the user without signals, as another process would
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        res = self.client.get(STUDENTS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        revoke_user_tokens(self.user.pk)
+        res = self.client.get(STUDENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
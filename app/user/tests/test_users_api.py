@@ -1,3 +1,5 @@
+import msgpack
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -39,6 +41,17 @@ class PublicUserApiTests(TestCase):
         self.assertIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_create_token_msgpack(self):
+        """Test that the token endpoint speaks MessagePack"""
+        payload = {'email': 'test@ya.ru', 'password': '123123123'}
+        create_user(**payload)
+        res = self.client.post(TOKEN_URL, msgpack.packb(payload),
+                               content_type='application/msgpack',
+                               HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', msgpack.unpackb(res.content))
+
     def test_create_token_invalid_credentials(self):
         """Test that token is not created if invalid credentials are given"""
         create_user(email='test@ya.ru', password='123123123')